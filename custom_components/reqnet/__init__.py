@@ -6,15 +6,37 @@ import json
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.const import CONF_MAC, CONF_HOST
+from homeassistant.const import CONF_MAC, CONF_HOST, CONF_PORT, CONF_USERNAME, CONF_PASSWORD
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
-from .coordinator import ReqnetDataCoordinator
+from .const import (
+    DOMAIN,
+    STORAGE_VERSION,
+    CONF_FRAME_WINDOW,
+    DEFAULT_FRAME_WINDOW,
+    BATCH_MAX_CONCURRENCY,
+    CONF_ARCHIVE,
+    CONF_TRANSPORT,
+    TRANSPORT_DIRECT_MQTT,
+    CONF_BROKER,
+    CONF_QOS_POLL,
+    CONF_QOS_COMMAND,
+    DEFAULT_MQTT_PORT,
+    PROFILE_MAX_DURATION,
+)
+from .archive import async_query_archive, async_remove_archive
+from .coordinator import ReqnetDataCoordinator, snapshot_storage_key
+from .profiler import async_profile
+from .transport import async_close_http_session
+from .websocket_api import async_register_websocket_api
 
 # Dodaj tę linię po imporcie const.py, około linii 17-18:
 
@@ -31,9 +53,100 @@ SERVICE_SET_MANUAL_MODE_SCHEMA = vol.Schema({
     vol.Required("air_extraction_value"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
 })
 
+# Serwisy zbiorcze - cel (device/area/label) wybierany przez target
+SERVICE_SET_MANUAL_MODE_MANY_SCHEMA = vol.Schema({
+    **cv.TARGET_SERVICE_FIELDS,
+    vol.Optional("airflow_value"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+    vol.Optional("air_extraction_value"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+})
+
+SERVICE_SET_AUTOMATIC_MODE_MANY_SCHEMA = vol.Schema({
+    **cv.TARGET_SERVICE_FIELDS,
+})
+
+SERVICE_QUERY_ARCHIVE_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Required("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("indices"): vol.All(cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=0))]),
+    vol.Optional("every"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+})
+
+SERVICE_PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("duration", default=30): vol.All(vol.Coerce(float), vol.Range(min=1, max=PROFILE_MAX_DURATION)),
+    vol.Optional("mode", default="timing"): vol.In(["timing", "cprofile"]),
+})
+
+SERVICES = ["set_manual_mode", "set_manual_mode_many", "set_automatic_mode_many", "query_archive", "profile"]
+
+def _direct_mqtt_options(entry: ConfigEntry) -> dict | None:
+    """Parametry własnego połączenia MQTT z opcji (None - klient MQTT Home Assistant)."""
+    options = entry.options
+    if options.get(CONF_TRANSPORT) != TRANSPORT_DIRECT_MQTT or not options.get(CONF_BROKER):
+        return None
+    return {
+        "broker": options[CONF_BROKER],
+        "port": options.get(CONF_PORT, DEFAULT_MQTT_PORT),
+        "username": options.get(CONF_USERNAME),
+        "password": options.get(CONF_PASSWORD),
+        "qos_poll": int(options.get(CONF_QOS_POLL, 0)),
+        "qos_command": int(options.get(CONF_QOS_COMMAND, 1)),
+    }
+
+def _async_get_target_coordinators(hass: HomeAssistant, call: ServiceCall) -> dict[str, ReqnetDataCoordinator]:
+    """Zwraca koordynatory urządzeń wskazanych przez target (urządzenia, encje, obszary, etykiety)."""
+    selected = async_extract_referenced_entity_ids(hass, call)
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    device_ids = set(selected.referenced_devices)
+    for entity_id in selected.referenced | selected.indirectly_referenced:
+        entity_entry = entity_registry.async_get(entity_id)
+        if entity_entry and entity_entry.device_id:
+            device_ids.add(entity_entry.device_id)
+
+    mac_addresses = set()
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            continue
+        for domain, identifier in device.identifiers:
+            if domain == DOMAIN:
+                mac_addresses.add(identifier)
+
+    return {
+        coord.mac_address: coord
+        for coord in hass.data[DOMAIN].values()
+        if isinstance(coord, ReqnetDataCoordinator) and coord.mac_address in mac_addresses
+    }
+
+async def _async_run_batch(coordinators: dict[str, ReqnetDataCoordinator], action) -> dict:
+    """Wykonuje polecenie równolegle na wszystkich urządzeniach (z limitem współbieżności)."""
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def _run(mac_address: str, coordinator: ReqnetDataCoordinator) -> tuple[str, dict]:
+        async with semaphore:
+            try:
+                success = await action(coordinator)
+            except Exception as e:
+                _LOGGER.exception(f"Błąd polecenia zbiorczego dla urządzenia {mac_address}: {e}")
+                return mac_address, {"success": False, "error": str(e)}
+        return mac_address, {"success": bool(success)}
+
+    results = dict(
+        await asyncio.gather(*(_run(mac, coord) for mac, coord in coordinators.items()))
+    )
+    succeeded = sum(1 for result in results.values() if result["success"])
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up Reqnet Recuperator from a configuration entry."""
     hass.data.setdefault(DOMAIN, {})
+    async_register_websocket_api(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -50,13 +163,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if not host:
         _LOGGER.warning("Host not found in config entry data, may affect some functionalities if HTTP is used elsewhere.")
 
-    coordinator = ReqnetDataCoordinator(hass, mac_address) 
+    coordinator = ReqnetDataCoordinator(
+        hass,
+        mac_address,
+        host=host,
+        frame_window=entry.options.get(CONF_FRAME_WINDOW, DEFAULT_FRAME_WINDOW),
+        archive=entry.options.get(CONF_ARCHIVE, False),
+        direct_mqtt=_direct_mqtt_options(entry),
+    )
     
-    try:
-        await coordinator.async_config_entry_first_refresh() 
-    except Exception as ex:
-        _LOGGER.error(f"Failed to fetch initial data for Reqnet device {mac_address} (Host: {host}): {ex}")
-        raise ConfigEntryNotReady(f"Failed to connect to Reqnet device: {ex}") from ex
+    # Warm start: encje startują z ostatnią zapisaną ramką zamiast czekać na urządzenie
+    if await coordinator.async_load_snapshot():
+        _LOGGER.info(f"Wczytano ostatnie znane dane dla urządzenia Reqnet {mac_address}")
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
@@ -64,6 +182,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     _LOGGER.info("INIT.PY: Po wywołaniu async_forward_entry_setups")
 
+    # Przeładuj integrację po zmianie opcji
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    # Pierwsze pobranie danych w tle - czas startu nie zależy od opóźnień urządzenia
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"reqnet_first_refresh_{coordinator.mac_address}"
+    )
+
     # Rejestracja serwisu
     async def async_set_manual_mode_service(call: ServiceCall) -> None:
         """Obsługa serwisu ustawiania trybu ręcznego."""
@@ -108,6 +234,102 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             schema=SERVICE_SET_MANUAL_MODE_SCHEMA,
         )
         _LOGGER.info("Zarejestrowano serwis reqnet.set_manual_mode")
+
+    async def async_set_manual_mode_many_service(call: ServiceCall) -> ServiceResponse:
+        """Ustawia tryb ręczny na wielu urządzeniach jednocześnie."""
+        coordinators = _async_get_target_coordinators(hass, call)
+        if not coordinators:
+            raise ServiceValidationError("Nie znaleziono urządzeń Reqnet dla podanego celu")
+
+        airflow_value = call.data.get("airflow_value")
+        air_extraction_value = call.data.get("air_extraction_value")
+        _LOGGER.info(f"Serwis set_manual_mode_many wywołany dla {len(coordinators)} urządzeń: nawiew={airflow_value}, wyciąg={air_extraction_value}")
+
+        return await _async_run_batch(
+            coordinators,
+            lambda coord: coord.async_set_manual_mode(airflow_value, air_extraction_value),
+        )
+
+    async def async_set_automatic_mode_many_service(call: ServiceCall) -> ServiceResponse:
+        """Ustawia tryb automatyczny na wielu urządzeniach jednocześnie."""
+        coordinators = _async_get_target_coordinators(hass, call)
+        if not coordinators:
+            raise ServiceValidationError("Nie znaleziono urządzeń Reqnet dla podanego celu")
+
+        _LOGGER.info(f"Serwis set_automatic_mode_many wywołany dla {len(coordinators)} urządzeń")
+
+        return await _async_run_batch(
+            coordinators,
+            lambda coord: coord.async_set_automatic_mode(),
+        )
+
+    if not hass.services.has_service(DOMAIN, "set_manual_mode_many"):
+        hass.services.async_register(
+            DOMAIN,
+            "set_manual_mode_many",
+            async_set_manual_mode_many_service,
+            schema=SERVICE_SET_MANUAL_MODE_MANY_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+        _LOGGER.info("Zarejestrowano serwis reqnet.set_manual_mode_many")
+
+    if not hass.services.has_service(DOMAIN, "set_automatic_mode_many"):
+        hass.services.async_register(
+            DOMAIN,
+            "set_automatic_mode_many",
+            async_set_automatic_mode_many_service,
+            schema=SERVICE_SET_AUTOMATIC_MODE_MANY_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+        _LOGGER.info("Zarejestrowano serwis reqnet.set_automatic_mode_many")
+
+    async def async_query_archive_service(call: ServiceCall) -> ServiceResponse:
+        """Odczyt archiwum ramek z zakresu czasu."""
+        mac_address = call.data["device_id"].replace(":", "").upper()
+        start = call.data["start"]
+        end = call.data.get("end") or dt_util.now()
+
+        # Dopisz zbuforowane ramki, aby odczyt obejmował najnowsze dane
+        for coord in hass.data[DOMAIN].values():
+            if isinstance(coord, ReqnetDataCoordinator) and coord.mac_address == mac_address and coord.archive:
+                await coord.archive.async_flush()
+
+        result = await async_query_archive(
+            hass,
+            mac_address,
+            start,
+            end,
+            indices=call.data.get("indices"),
+            every=call.data.get("every"),
+        )
+        return {"device": mac_address, **result}
+
+    if not hass.services.has_service(DOMAIN, "query_archive"):
+        hass.services.async_register(
+            DOMAIN,
+            "query_archive",
+            async_query_archive_service,
+            schema=SERVICE_QUERY_ARCHIVE_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+        _LOGGER.info("Zarejestrowano serwis reqnet.query_archive")
+
+    async def async_profile_service(call: ServiceCall) -> ServiceResponse:
+        """Profilowanie gorących ścieżek integracji przez zadany czas."""
+        _LOGGER.info(f"Profilowanie Reqnet ({call.data['mode']}) przez {call.data['duration']} s")
+        result = await async_profile(hass, call.data["duration"], call.data["mode"])
+        _LOGGER.info(f"Wyniki profilowania Reqnet zapisano w {result['summary_file']}")
+        return result
+
+    if not hass.services.has_service(DOMAIN, "profile"):
+        hass.services.async_register(
+            DOMAIN,
+            "profile",
+            async_profile_service,
+            schema=SERVICE_PROFILE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+        _LOGGER.info("Zarejestrowano serwis reqnet.profile")
         
     return True
 
@@ -124,10 +346,25 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
         
-        # Usuń serwis jeśli to był ostatni entry
+        # Usuń serwisy jeśli to był ostatni entry
         if not hass.data[DOMAIN]:
-            if hass.services.has_service(DOMAIN, "set_manual_mode"):
-                hass.services.async_remove(DOMAIN, "set_manual_mode")
-                _LOGGER.info("Usunięto serwis reqnet.set_manual_mode")
+            await async_close_http_session(hass)
+            for service in SERVICES:
+                if hass.services.has_service(DOMAIN, service):
+                    hass.services.async_remove(DOMAIN, service)
+                    _LOGGER.info(f"Usunięto serwis reqnet.{service}")
 
     return unload_ok
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload config entry after options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Usuwa zapisaną ramkę i archiwum ramek po usunięciu integracji."""
+    mac_address = entry.data.get(CONF_MAC)
+    if mac_address:
+        mac_address = mac_address.replace(":", "").upper()
+        store = Store(hass, STORAGE_VERSION, snapshot_storage_key(mac_address))
+        await store.async_remove()
+        await async_remove_archive(hass, mac_address)
@@ -0,0 +1,335 @@
+"""Archiwum surowych ramek CWP - plik binarny o stałej szerokości rekordu na urządzenie i dzień.
+
+Układ pliku (little-endian, jak na wszystkich platformach HA):
+    nagłówek: magic "RQNA", wersja (uint16), liczba kolumn N (uint16),
+              N kodów typów kolumn ("f" lub "i", ASCII) dopełnionych do wielokrotności 4 bajtów
+    rekord:   uint32 ms od północy UTC + N x (float32 lub int32), każda komórka 4 bajty
+              (brak wartości: NaN dla float32, INT_MISSING dla int32)
+
+Typ kolumny ustalany jest z pierwszej ramki pliku: liczby całkowite, których float32
+nie zapisuje dokładnie (|x| > 2^24, np. liczniki), trafiają do kolumny int32, pozostałe
+do float32. Ograniczenia: wartość ułamkowa w kolumnie int32 jest zaokrąglana, wartość
+spoza zakresu int32 zapisywana jest jako brak, a licznik, który przekroczy 2^24 dopiero
+w trakcie dnia, do końca tego pliku traci precyzję (float32). Pliki w wersji 1
+(wszystkie kolumny float32) są nadal odczytywane i dopisywane.
+
+Odczyt mapuje plik w pamięci (mmap) i zwraca kolumny jako widoki memoryview
+z krokiem równym szerokości rekordu - bez kopiowania całego pliku.
+"""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+import logging
+import math
+import mmap
+import os
+import shutil
+import struct
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import ARCHIVE_DIR, ARCHIVE_FLUSH_INTERVAL
+from .frame import ReqnetFrame
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"RQNA"
+ARCHIVE_VERSION = 2
+HEADER = struct.Struct("<4sHH")
+TIMESTAMP_SIZE = 4
+VALUE_SIZE = 4
+INT_MISSING = -(2**31)
+# Największa liczba całkowita zapisywana dokładnie w float32
+FLOAT32_EXACT_LIMIT = 2**24
+
+
+def _archive_dir(hass: HomeAssistant, mac_address: str) -> str:
+    """Katalog archiwum urządzenia."""
+    return hass.config.path(ARCHIVE_DIR, mac_address)
+
+
+def _day_path(directory: str, day: date) -> str:
+    """Plik archiwum dla danego dnia (UTC)."""
+    return os.path.join(directory, f"{day.isoformat()}.bin")
+
+
+def _column_type(value: float) -> str:
+    """Typ kolumny dla wartości z pierwszej ramki pliku."""
+    if value.is_integer() and FLOAT32_EXACT_LIMIT < abs(value) < -INT_MISSING:
+        return "i"
+    return "f"
+
+
+def _int_cell(value: float) -> int:
+    """Wartość komórki int32 (brak lub wartość spoza zakresu -> INT_MISSING)."""
+    if value != value or not INT_MISSING < value < -INT_MISSING:
+        return INT_MISSING
+    return round(value)
+
+
+def _header_size(columns: int) -> int:
+    """Rozmiar nagłówka w wersji 2 (kody typów dopełnione do 4 bajtów)."""
+    return HEADER.size + (columns + 3) // 4 * 4
+
+
+def _read_header(file) -> tuple[int, str, int] | None:
+    """Czyta nagłówek: (liczba kolumn, typy kolumn, rozmiar nagłówka) lub None dla nieznanego formatu."""
+    magic, version, columns = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        return None
+    if version == 1:
+        return columns, "f" * columns, HEADER.size
+    if version == 2:
+        types = file.read(columns).decode("ascii")
+        if len(types) != columns or set(types) - {"f", "i"}:
+            return None
+        return columns, types, _header_size(columns)
+    return None
+
+
+def _ms_since_midnight(moment: datetime) -> int:
+    """Milisekundy od północy UTC."""
+    return (
+        (moment.hour * 3600 + moment.minute * 60 + moment.second) * 1000
+        + moment.microsecond // 1000
+    )
+
+
+class ReqnetFrameArchive:
+    """Dopisuje ramki CWP jednego urządzenia do archiwum (zapis buforowany, w executorze)."""
+
+    def __init__(self, hass: HomeAssistant, mac_address: str) -> None:
+        """Inicjalizacja."""
+        self._hass = hass
+        self._directory = _archive_dir(hass, mac_address)
+        self._buffer: list[ReqnetFrame] = []
+        self._lock = asyncio.Lock()
+        self._unsub_flush = None
+
+    @callback
+    def async_append(self, frame: ReqnetFrame) -> None:
+        """Dodaje ramkę do bufora; zapis na dysk co ARCHIVE_FLUSH_INTERVAL."""
+        self._buffer.append(frame)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, ARCHIVE_FLUSH_INTERVAL, self._async_scheduled_flush
+            )
+
+    @callback
+    def _async_scheduled_flush(self, _now) -> None:
+        """Zapis zaplanowany przez async_append."""
+        self._unsub_flush = None
+        self._hass.async_create_background_task(
+            self.async_flush(), f"reqnet_archive_flush_{os.path.basename(self._directory)}"
+        )
+
+    async def async_flush(self) -> None:
+        """Zapisuje zbuforowane ramki."""
+        async with self._lock:
+            if not self._buffer:
+                return
+            frames, self._buffer = self._buffer, []
+            try:
+                await self._hass.async_add_executor_job(self._write, frames)
+            except OSError as e:
+                _LOGGER.error(f"Nie udało się zapisać archiwum ramek w {self._directory}: {e}")
+
+    async def async_shutdown(self) -> None:
+        """Anuluje zaplanowany zapis i zapisuje bufor."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        await self.async_flush()
+
+    def _write(self, frames: list[ReqnetFrame]) -> None:
+        """Dopisuje rekordy do plików dziennych (executor)."""
+        os.makedirs(self._directory, exist_ok=True)
+
+        by_day: dict[date, list[tuple[datetime, ReqnetFrame]]] = {}
+        for frame in frames:
+            received_at = datetime.fromtimestamp(frame.received_at, dt_util.UTC)
+            by_day.setdefault(received_at.date(), []).append((received_at, frame))
+
+        for day, day_frames in by_day.items():
+            path = _day_path(self._directory, day)
+            with open(path, "ab") as file:
+                if file.tell() == 0:
+                    first = day_frames[0][1].values
+                    columns = len(first)
+                    types = "".join(_column_type(value) for value in first)
+                    file.write(HEADER.pack(MAGIC, ARCHIVE_VERSION, columns))
+                    file.write(types.encode("ascii").ljust(_header_size(columns) - HEADER.size, b"\0"))
+                else:
+                    with open(path, "rb") as header_file:
+                        header = _read_header(header_file)
+                    if header is None:
+                        _LOGGER.error(f"Nieznany format pliku archiwum {path} - ramki pominięte")
+                        continue
+                    columns, types, _ = header
+
+                record = struct.Struct(f"<I{types}")
+                int_columns = [index for index, code in enumerate(types) if code == "i"]
+                padding = [math.nan] * columns
+                chunk = bytearray()
+                for received_at, frame in day_frames:
+                    # Ramka dopasowana do liczby kolumn pliku (dopełnienie NaN / obcięcie)
+                    row = frame.values[:columns].tolist()
+                    row.extend(padding[len(row):])
+                    for index in int_columns:
+                        row[index] = _int_cell(row[index])
+                    chunk += record.pack(_ms_since_midnight(received_at), *row)
+                file.write(chunk)
+
+
+def _read_day(
+    path: str, start_ms: int, end_ms: int, indices: list[int] | None
+) -> tuple[list[int], dict[int, list[float]]]:
+    """Czyta zakres czasu z pliku dziennego przez mmap (executor)."""
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= HEADER.size:
+            return [], {}
+        header = _read_header(file)
+        if header is None:
+            _LOGGER.warning(f"Pominięto plik archiwum o nieznanym formacie: {path}")
+            return [], {}
+        columns, types, header_size = header
+
+        stride = 1 + columns
+        record_size = TIMESTAMP_SIZE + columns * VALUE_SIZE
+        # Niepełny rekord na końcu (np. przerwany zapis) jest pomijany
+        records = max(size - header_size, 0) // record_size
+        if records == 0:
+            return [], {}
+
+        wanted = [index for index in (indices if indices is not None else range(columns)) if index < columns]
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            views: list[memoryview] = []
+            try:
+                body = memoryview(mapped)[header_size:header_size + records * record_size]
+                views.append(body)
+                timestamps_view = body.cast("I")[0::stride]
+                values_view = body.cast("f")
+                views.extend((timestamps_view, values_view))
+                # Komórki int32 mają ten sam rozmiar - ten sam krok, inny widok typu
+                int_view = body.cast("i") if "i" in types else None
+                if int_view is not None:
+                    views.append(int_view)
+
+                low = bisect_left(timestamps_view, start_ms)
+                high = bisect_right(timestamps_view, end_ms)
+                timestamps = timestamps_view[low:high].tolist()
+
+                columns_out: dict[int, list[float]] = {}
+                for index in wanted:
+                    if types[index] == "i":
+                        column = int_view[1 + index::stride]
+                        views.append(column)
+                        columns_out[index] = [
+                            math.nan if value == INT_MISSING else value
+                            for value in column[low:high].tolist()
+                        ]
+                    else:
+                        column = values_view[1 + index::stride]
+                        views.append(column)
+                        columns_out[index] = column[low:high].tolist()
+            finally:
+                for view in reversed(views):
+                    view.release()
+
+    return timestamps, columns_out
+
+
+def _downsample(
+    timestamps: list[float], columns: dict[int, list[float]], every: float
+) -> tuple[list[float], dict[int, list[float]]]:
+    """Średnia w przedziałach po `every` sekund (NaN pomijane)."""
+    bucket_timestamps: list[float] = []
+    bucket_columns: dict[int, list[float]] = {index: [] for index in columns}
+
+    start = 0
+    while start < len(timestamps):
+        bucket = timestamps[start] // every
+        end = start
+        while end < len(timestamps) and timestamps[end] // every == bucket:
+            end += 1
+        bucket_timestamps.append(bucket * every)
+        for index, column in columns.items():
+            samples = [value for value in column[start:end] if not math.isnan(value)]
+            bucket_columns[index].append(sum(samples) / len(samples) if samples else math.nan)
+        start = end
+
+    return bucket_timestamps, bucket_columns
+
+
+def _query(
+    directory: str,
+    start: datetime,
+    end: datetime,
+    indices: list[int] | None,
+    every: float | None,
+) -> dict[str, Any]:
+    """Odczyt archiwum z zakresu dni (executor)."""
+    timestamps: list[float] = []
+    columns: dict[int, list[float]] = {}
+
+    day = start.date()
+    while day <= end.date():
+        path = _day_path(directory, day)
+        if os.path.exists(path):
+            start_ms = _ms_since_midnight(start) if day == start.date() else 0
+            end_ms = _ms_since_midnight(end) if day == end.date() else 86_400_000
+            day_timestamps, day_columns = _read_day(path, start_ms, end_ms, indices)
+            midnight = datetime(day.year, day.month, day.day, tzinfo=dt_util.UTC).timestamp()
+            timestamps.extend(midnight + ms / 1000 for ms in day_timestamps)
+            for index, values in day_columns.items():
+                # Kolumny brakujące we wcześniejszych dniach dopełniane są NaN
+                column = columns.setdefault(index, [math.nan] * (len(timestamps) - len(day_timestamps)))
+                column.extend(values)
+            for index, column in columns.items():
+                if index not in day_columns:
+                    column.extend([math.nan] * len(day_timestamps))
+        day += timedelta(days=1)
+
+    if every:
+        timestamps, columns = _downsample(timestamps, columns, every)
+
+    return {
+        "timestamps": timestamps,
+        "values": {
+            str(index): [None if math.isnan(value) else value for value in column]
+            for index, column in sorted(columns.items())
+        },
+    }
+
+
+async def async_query_archive(
+    hass: HomeAssistant,
+    mac_address: str,
+    start: datetime,
+    end: datetime,
+    indices: list[int] | None = None,
+    every: float | None = None,
+) -> dict[str, Any]:
+    """Zwraca ramki z archiwum urządzenia w zakresie [start, end] (czasy jako epoch w sekundach)."""
+    return await hass.async_add_executor_job(
+        _query,
+        _archive_dir(hass, mac_address),
+        dt_util.as_utc(start),
+        dt_util.as_utc(end),
+        indices,
+        every,
+    )
+
+
+async def async_remove_archive(hass: HomeAssistant, mac_address: str) -> None:
+    """Usuwa archiwum urządzenia (po usunięciu pozycji konfiguracji)."""
+    await hass.async_add_executor_job(
+        shutil.rmtree, _archive_dir(hass, mac_address), True
+    )
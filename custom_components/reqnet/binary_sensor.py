@@ -2,18 +2,43 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.binary_sensor import (
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import ReqnetDataCoordinator
+from .entity import ReqnetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, kw_only=True)
+class ReqnetBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Opis sensora binarnego Reqnet - wspólny dla wszystkich urządzeń."""
+
+    index: int
+    off_icon: str | None = None
+
+
+BINARY_SENSOR_DESCRIPTIONS: tuple[ReqnetBinarySensorEntityDescription, ...] = (
+    # Indeks 0: Status urządzenia (1 - włączone, 0 - wyłączone)
+    # Klucz odpowiada dotychczasowemu unique_id (wyprowadzanemu z nazwy)
+    ReqnetBinarySensorEntityDescription(
+        key="rekuperator_-_status_urządzenia",
+        index=0,
+        name="Rekuperator - Status urządzenia",
+        icon="mdi:power",
+        off_icon="mdi:power-off",
+    ),
+)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -22,50 +47,36 @@ async def async_setup_entry(
     """Set up Reqnet binary sensor platform."""
     coordinator: ReqnetDataCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    binary_sensors = [
-        # Indeks 0: Status urządzenia (1 - włączone, 0 - wyłączone)
-        ReqnetBinarySensor(coordinator, 0, "Rekuperator - Status urządzenia", "mdi:power", "mdi:power-off"),
-    ]
+    async_add_entities(
+        ReqnetBinarySensor(coordinator, description) for description in BINARY_SENSOR_DESCRIPTIONS
+    )
 
-    async_add_entities(binary_sensors)
 
-
-class ReqnetBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class ReqnetBinarySensor(ReqnetEntity, BinarySensorEntity):
     """Representation of a Reqnet Binary Sensor."""
     _attr_has_entity_name = True
-    def __init__(
-        self,
-        coordinator: ReqnetDataCoordinator,
-        index: int,
-        name: str,
-        on_icon: str | None,
-        off_icon: str | None,
-    ) -> None:
-        """Initialize the binary sensor."""
-        super().__init__(coordinator)
-        self._index = index
-        self._name = name
-        self._on_icon = on_icon
-        self._off_icon = off_icon
-
-        self._attr_unique_id = f"{coordinator.mac_address.replace(':', '').lower()}_{name.lower().replace(' ', '_')}"
-        self._attr_name = name
-
-        # Powiąż encję z urządzeniem (rekuperatorem)
-        
-        #}
+
+    entity_description: ReqnetBinarySensorEntityDescription
 
     @property
     def is_on(self) -> bool | None:
         """Return true if the binary sensor is on."""
-        if self.coordinator.data is None or self._index >= len(self.coordinator.data):
+        index = self.entity_description.index
+        if self.coordinator.data is None or index >= len(self.coordinator.data):
             return None
         # Zakładamy, że 1 to True (on), a 0 to False (off)
-        return bool(self.coordinator.data[self._index])
+        return bool(self.coordinator.data[index])
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Oznacza wartości wczytane z zapisanej ramki (przed pierwszym odczytem na żywo)."""
+        if self.coordinator.restored:
+            return {"restored": True, "restored_at": self.coordinator.restored_at}
+        return None
 
     @property
     def icon(self):
         """Return the icon of the binary sensor."""
         if self.is_on:
-            return self._on_icon
-        return self._off_icon
\ No newline at end of file
+            return self.entity_description.icon
+        return self.entity_description.off_icon
@@ -10,10 +10,10 @@ from homeassistant.components.button import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import ReqnetDataCoordinator
+from .entity import ReqnetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,27 +49,9 @@ async def async_setup_entry(
     async_add_entities(buttons)
 
 
-class ReqnetAutomaticModeButton(CoordinatorEntity[ReqnetDataCoordinator], ButtonEntity):
+class ReqnetAutomaticModeButton(ReqnetEntity, ButtonEntity):
     """Reprezentacja przycisku Reqnet do włączania trybu automatycznego."""
 
-    def __init__(
-        self,
-        coordinator: ReqnetDataCoordinator,
-        description: ButtonEntityDescription,
-    ) -> None:
-        """Inicjalizacja przycisku."""
-        super().__init__(coordinator)
-        self.entity_description = description
-        
-        self._attr_unique_id = f"{coordinator.mac_address.replace(':', '').lower()}_{description.key}"
-        
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, coordinator.mac_address)},
-            "name": f"Reqnet Recuperator ({coordinator.mac_address})",
-            "manufacturer": "Reqnet",
-            "model": "Recuperator",
-        }
-
     @property
     def available(self) -> bool:
         """Sprawdź czy przycisk jest dostępny."""
@@ -98,27 +80,9 @@ class ReqnetAutomaticModeButton(CoordinatorEntity[ReqnetDataCoordinator], Button
             _LOGGER.exception(f"Błąd podczas wywoływania AutomaticMode: {e}")
 
 
-class ReqnetManualModeButton(CoordinatorEntity[ReqnetDataCoordinator], ButtonEntity):
+class ReqnetManualModeButton(ReqnetEntity, ButtonEntity):
     """Reprezentacja przycisku Reqnet do włączania trybu ręcznego."""
 
-    def __init__(
-        self,
-        coordinator: ReqnetDataCoordinator,
-        description: ButtonEntityDescription,
-    ) -> None:
-        """Inicjalizacja przycisku."""
-        super().__init__(coordinator)
-        self.entity_description = description
-        
-        self._attr_unique_id = f"{coordinator.mac_address.replace(':', '').lower()}_{description.key}"
-        
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, coordinator.mac_address)},
-            "name": f"Reqnet Recuperator ({coordinator.mac_address})",
-            "manufacturer": "Reqnet",
-            "model": "Recuperator",
-        }
-
     @property
     def available(self) -> bool:
         """Sprawdź czy przycisk jest dostępny."""
@@ -130,11 +94,14 @@ class ReqnetManualModeButton(CoordinatorEntity[ReqnetDataCoordinator], ButtonEnt
         attributes = {}
         
         # Dodaj aktualne wartości jako atrybuty
-        if self.coordinator.data and len(self.coordinator.data) > 6:
-            attributes["current_airflow_manual"] = self.coordinator.data[5]  # API Index 6
-            attributes["current_extraction_manual"] = self.coordinator.data[6]  # API Index 7
-            attributes["current_airflow_actual"] = self.coordinator.data[3]  # API Index 4
-            attributes["current_extraction_actual"] = self.coordinator.data[4]  # API Index 5
+        frame = self.coordinator.data
+        if frame and len(frame) > 6:
+            attributes["current_airflow_manual"] = frame[5]  # API Index 6
+            attributes["current_extraction_manual"] = frame[6]  # API Index 7
+            attributes["current_airflow_actual"] = frame[3]  # API Index 4
+            attributes["current_extraction_actual"] = frame[4]  # API Index 5
+            attributes["frame_seq"] = frame.seq
+            attributes["frame_received_at"] = frame.received_at
         
         attributes["info"] = "Użyj service reqnet.set_manual_mode z parametrami airflow_value i air_extraction_value"
         
@@ -161,4 +128,4 @@ class ReqnetManualModeButton(CoordinatorEntity[ReqnetDataCoordinator], ButtonEnt
                     "message": "Nie udało się włączyć trybu ręcznego"
                 })
         except Exception as e:
-            _LOGGER.exception(f"Błąd podczas wywoływania ManualMode: {e}")
\ No newline at end of file
+            _LOGGER.exception(f"Błąd podczas wywoływania ManualMode: {e}")
@@ -1,15 +1,41 @@
 """Config flow for Reqnet Recuperator integration."""
+import asyncio
 import logging
 import json
 
+import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_HOST, CONF_MAC
+from homeassistant.const import CONF_HOST, CONF_MAC, CONF_PORT, CONF_USERNAME, CONF_PASSWORD
 from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession # ZMIENIONY IMPORT!
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.selector import (
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 
-from .const import DOMAIN, API_PATH_API
+from .const import (
+    DOMAIN,
+    CONF_FRAME_WINDOW,
+    DEFAULT_FRAME_WINDOW,
+    CONF_ARCHIVE,
+    CONF_TRANSPORT,
+    TRANSPORT_HA_MQTT,
+    TRANSPORT_DIRECT_MQTT,
+    CONF_BROKER,
+    CONF_QOS_POLL,
+    CONF_QOS_COMMAND,
+    DEFAULT_MQTT_PORT,
+    CONF_SUBNET,
+    CONF_DURATION,
+    CONF_DEVICES,
+    DEFAULT_MQTT_LISTEN_DURATION,
+)
+from .discovery import async_probe_host, async_scan_subnet, async_listen_mqtt
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,14 +44,39 @@ DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_HOST): str,
 })
 
+SCAN_SCHEMA = vol.Schema({
+    vol.Required(CONF_SUBNET, default="192.168.1.0/24"): str,
+})
+
+MQTT_LISTEN_SCHEMA = vol.Schema({
+    vol.Required(CONF_DURATION, default=DEFAULT_MQTT_LISTEN_DURATION): vol.All(
+        vol.Coerce(int), vol.Range(min=5, max=120)
+    ),
+})
+
 class ReqnetConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Reqnet Recuperator."""
 
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        # Wykryte urządzenia: {MAC: host lub None (wykryte tylko przez MQTT)}
+        self._discovered: dict[str, str | None] = {}
+        self._listen_duration: int = DEFAULT_MQTT_LISTEN_DURATION
+        self._listen_task: asyncio.Task | None = None
+        self._listen_error: str | None = None
+
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
+        """Handle the initial step - wybór sposobu dodania urządzeń."""
+        return self.async_show_menu(
+            step_id="user",
+            menu_options=["manual", "scan", "mqtt_listen"],
+        )
+
+    async def async_step_manual(self, user_input=None):
+        """Dodanie jednego urządzenia po adresie IP."""
         errors = {}
         if user_input is not None:
             host = user_input[CONF_HOST]
@@ -33,64 +84,219 @@ class ReqnetConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             # Spróbuj pobrać MAC address z API przez HTTP
             try:
-                # Używamy sesji klienta aiohttp Home Assistant
                 session = async_get_clientsession(self.hass)
-                api_url = f"http://{host}{API_PATH_API}"
-                _LOGGER.debug(f"Attempting to connect to Reqnet API at: {api_url}")
-                
-                # Czasami URL z API może być wrażliwy na końcowe slash/jego brak.
-                # Upewnijmy się, że jest poprawny.
-                response = await session.get(api_url, timeout=10)
-                
-                response.raise_for_status() # Rzuć wyjątek dla kodów statusu 4xx/5xx
-
-                api_data = await response.json() # Ważne: używamy await response.json() dla aiohttp
-                _LOGGER.debug(f"Received API response: {api_data}")
-
-                if not api_data.get("APIResult") or "MAC" not in api_data:
-                    _LOGGER.error(f"Unexpected API response structure from {host}: {api_data}")
+                _LOGGER.debug(f"Attempting to connect to Reqnet API at: {host}")
+                mac_address = await async_probe_host(session, host, timeout=10)
+
+                if not mac_address:
+                    _LOGGER.error(f"Unexpected API response structure from {host}")
                     errors["base"] = "invalid_response"
                 else:
-                    mac_address = api_data["MAC"]
                     _LOGGER.info(f"Successfully discovered MAC address: {mac_address} for host: {host}")
 
-            except Exception as e: # Zmieniono na ogólny Exception na potrzeby diagnostyki
-                response_text = "N/A"
-                if 'response' in locals() and hasattr(response, 'text'):
-                    try:
-                        response_text = await response.text() # Spróbuj pobrać tekst odpowiedzi
-                    except Exception:
-                        response_text = "Could not retrieve response text"
-                
-                _LOGGER.exception(f"An error occurred during API call to {host}. Response: {response_text}. Error type: {type(e).__name__}, Message: {e}")
-                
-                if isinstance(e, (TimeoutError, httpx.ConnectError)): # Uwaga: httpx.ConnectError może nadal być rzucony, jeśli jest w buforze
-                    errors["base"] = "cannot_connect"
-                elif isinstance(e, json.JSONDecodeError):
-                    errors["base"] = "invalid_json"
-                elif isinstance(e, httpx.RequestError): # Uwaga: httpx.RequestError może nadal być rzucony
-                     errors["base"] = "http_error"
-                else:
-                    errors["base"] = "unknown"
+            except aiohttp.ClientResponseError as e:
+                _LOGGER.error(f"HTTP error during API call to {host}: {e}")
+                errors["base"] = "http_error"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                _LOGGER.error(f"Cannot connect to Reqnet API at {host}: {type(e).__name__}: {e}")
+                errors["base"] = "cannot_connect"
+            except json.JSONDecodeError as e:
+                _LOGGER.error(f"Invalid JSON from Reqnet API at {host}: {e}")
+                errors["base"] = "invalid_json"
+            except Exception as e:
+                _LOGGER.exception(f"An error occurred during API call to {host}. Error type: {type(e).__name__}, Message: {e}")
+                errors["base"] = "unknown"
 
             if not errors and mac_address:
-                unique_id = mac_address.replace(":", "").lower()
-                await self.async_set_unique_id(unique_id)
+                await self.async_set_unique_id(_unique_id(mac_address))
                 self._abort_if_unique_id_configured()
+                return self._async_create_reqnet_entry(mac_address, host)
+
+        return self.async_show_form(
+            step_id="manual", data_schema=DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_scan(self, user_input=None):
+        """Skan podsieci - równoległe zapytania HTTP do wszystkich adresów."""
+        errors = {}
+        if user_input is not None:
+            try:
+                found = await async_scan_subnet(self.hass, user_input[CONF_SUBNET])
+            except ValueError as e:
+                _LOGGER.error(f"Niepoprawna podsieć {user_input[CONF_SUBNET]}: {e}")
+                errors["base"] = "invalid_subnet"
+            else:
+                self._discovered = dict(found)
+                return await self.async_step_pick_devices()
+
+        return self.async_show_form(
+            step_id="scan", data_schema=SCAN_SCHEMA, errors=errors
+        )
+
+    async def async_step_mqtt_listen(self, user_input=None):
+        """Pasywny nasłuch odpowiedzi CWP na brokerze MQTT.
+
+        Wykrywa urządzenia, które są już odpytywane przez innego klienta brokera.
+        """
+        if user_input is not None:
+            self._listen_duration = user_input[CONF_DURATION]
+            return await self.async_step_mqtt_listen_progress()
+
+        errors = {}
+        if self._listen_error:
+            errors["base"] = self._listen_error
+            self._listen_error = None
+        return self.async_show_form(step_id="mqtt_listen", data_schema=MQTT_LISTEN_SCHEMA, errors=errors)
+
+    async def async_step_mqtt_listen_progress(self, user_input=None):
+        """Nasłuch w tle - użytkownik widzi postęp zamiast zawieszonego formularza."""
+        if self._listen_task is None:
+            self._listen_task = self.hass.async_create_task(
+                async_listen_mqtt(self.hass, self._listen_duration)
+            )
+        if not self._listen_task.done():
+            return self.async_show_progress(
+                step_id="mqtt_listen_progress",
+                progress_action="mqtt_listen",
+                progress_task=self._listen_task,
+                description_placeholders={"duration": str(self._listen_duration)},
+            )
+
+        task = self._listen_task
+        self._listen_task = None
+        try:
+            found = task.result()
+        except HomeAssistantError as e:
+            # Integracja MQTT nie jest skonfigurowana lub niedostępna
+            _LOGGER.error(f"Nie można nasłuchiwać na brokerze MQTT: {e}")
+            self._listen_error = "mqtt_not_available"
+            return self.async_show_progress_done(next_step_id="mqtt_listen")
+        except Exception as e:
+            _LOGGER.exception(f"Błąd podczas nasłuchu MQTT: {e}")
+            self._listen_error = "unknown"
+            return self.async_show_progress_done(next_step_id="mqtt_listen")
+
+        self._discovered = {mac_address: None for mac_address in found}
+        return self.async_show_progress_done(next_step_id="pick_devices")
 
-                return self.async_create_entry(
-                    title=f"Reqnet ({mac_address})",
-                    data={
-                        CONF_HOST: host,
-                        CONF_MAC: mac_address
-                    }
+    async def async_step_pick_devices(self, user_input=None):
+        """Wybór wykrytych urządzeń do dodania (wiele naraz)."""
+        if user_input is not None:
+            selected = user_input[CONF_DEVICES]
+            if not selected:
+                return self.async_abort(reason="no_devices_selected")
+
+            # Pozostałe urządzenia dodawane są w osobnych przepływach (jedna pozycja na urządzenie)
+            for mac_address in selected[1:]:
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_IMPORT},
+                        data={CONF_MAC: mac_address, CONF_HOST: self._discovered.get(mac_address)},
+                    )
                 )
 
+            mac_address = selected[0]
+            await self.async_set_unique_id(_unique_id(mac_address))
+            self._abort_if_unique_id_configured()
+            return self._async_create_reqnet_entry(mac_address, self._discovered.get(mac_address))
+
+        configured = {entry.unique_id for entry in self._async_current_entries()}
+        candidates = {
+            mac_address: f"{mac_address} ({host})" if host else mac_address
+            for mac_address, host in sorted(self._discovered.items())
+            if _unique_id(mac_address) not in configured
+        }
+        if not candidates:
+            return self.async_abort(reason="no_devices_found")
+
         return self.async_show_form(
-            step_id="user", data_schema=DATA_SCHEMA, errors=errors
+            step_id="pick_devices",
+            data_schema=vol.Schema({
+                vol.Required(CONF_DEVICES, default=list(candidates)): cv.multi_select(candidates),
+            }),
+            description_placeholders={"count": str(len(candidates))},
         )
 
+    async def async_step_import(self, import_data):
+        """Dodanie urządzenia wybranego w kroku pick_devices."""
+        mac_address = import_data[CONF_MAC]
+        await self.async_set_unique_id(_unique_id(mac_address))
+        self._abort_if_unique_id_configured()
+        return self._async_create_reqnet_entry(mac_address, import_data.get(CONF_HOST))
+
     @callback
-    def _async_current_entries(self):
-        """Return current entries."""
-        return self._async_get_current_entries(include_ignore=False)
\ No newline at end of file
+    def _async_create_reqnet_entry(self, mac_address: str, host: str | None):
+        """Tworzy pozycję konfiguracji dla urządzenia."""
+        data = {CONF_MAC: mac_address}
+        if host:
+            data[CONF_HOST] = host
+        return self.async_create_entry(title=f"Reqnet ({mac_address})", data=data)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return ReqnetOptionsFlow()
+
+
+def _unique_id(mac_address: str) -> str:
+    """Unique ID pozycji konfiguracji na podstawie adresu MAC."""
+    return mac_address.replace(":", "").lower()
+
+
+class ReqnetOptionsFlow(config_entries.OptionsFlow):
+    """Handle Reqnet options."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        errors = {}
+        if user_input is not None:
+            # Hasło nie jest pokazywane w formularzu - puste pole zachowuje zapisane hasło
+            if not user_input.get(CONF_PASSWORD) and self.config_entry.options.get(CONF_PASSWORD):
+                user_input = {**user_input, CONF_PASSWORD: self.config_entry.options[CONF_PASSWORD]}
+            if user_input[CONF_TRANSPORT] == TRANSPORT_DIRECT_MQTT and not user_input.get(CONF_BROKER):
+                errors[CONF_BROKER] = "broker_required"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self.config_entry.options
+        schema = vol.Schema({
+            vol.Optional(
+                CONF_FRAME_WINDOW,
+                default=options.get(CONF_FRAME_WINDOW, DEFAULT_FRAME_WINDOW),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+            vol.Optional(
+                CONF_ARCHIVE,
+                default=options.get(CONF_ARCHIVE, False),
+            ): bool,
+            # Własne połączenie z brokerem odizolowane od klienta MQTT Home Assistant
+            vol.Optional(
+                CONF_TRANSPORT,
+                default=options.get(CONF_TRANSPORT, TRANSPORT_HA_MQTT),
+            ): vol.In([TRANSPORT_HA_MQTT, TRANSPORT_DIRECT_MQTT]),
+            vol.Optional(
+                CONF_BROKER,
+                description={"suggested_value": options.get(CONF_BROKER)},
+            ): str,
+            vol.Optional(
+                CONF_PORT,
+                default=options.get(CONF_PORT, DEFAULT_MQTT_PORT),
+            ): cv.port,
+            vol.Optional(
+                CONF_USERNAME,
+                description={"suggested_value": options.get(CONF_USERNAME)},
+            ): str,
+            vol.Optional(CONF_PASSWORD): TextSelector(
+                TextSelectorConfig(type=TextSelectorType.PASSWORD)
+            ),
+            vol.Optional(
+                CONF_QOS_POLL,
+                default=options.get(CONF_QOS_POLL, 0),
+            ): vol.All(vol.Coerce(int), vol.In([0, 1, 2])),
+            vol.Optional(
+                CONF_QOS_COMMAND,
+                default=options.get(CONF_QOS_COMMAND, 1),
+            ): vol.All(vol.Coerce(int), vol.In([0, 1, 2])),
+        })
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -3,4 +3,55 @@
 DOMAIN = "reqnet"
 
 API_PATH_API = "/API/RunFunction?name=API"
-API_PATH_CURRENT_WORK_PARAMS = "/API/RunFunction?name=CurrentWorkParameters"
\ No newline at end of file
+API_PATH_CURRENT_WORK_PARAMS = "/API/RunFunction?name=CurrentWorkParameters"
+
+# Zapis ostatniej poprawnej ramki CWP (warm start po restarcie HA)
+STORAGE_VERSION = 1
+STORAGE_KEY_SNAPSHOT = f"{DOMAIN}.snapshot"
+SNAPSHOT_SAVE_DELAY = 60  # sekundy - zapisy na dysk są dławione
+
+# Sygnał dispatchera wysyłany przy zamykaniu koordynatora (format: MAC)
+SIGNAL_COORDINATOR_SHUTDOWN = f"{DOMAIN}_coordinator_shutdown_{{}}"
+
+# Limit ramek CWP na urządzenie (opcja integracji)
+CONF_FRAME_WINDOW = "frame_window"
+DEFAULT_FRAME_WINDOW = 2.0  # sekundy, 0 = bez łączenia ramek
+
+# Serwisy zbiorcze - maksymalna liczba równoległych poleceń
+BATCH_MAX_CONCURRENCY = 8
+
+# Wykrywanie urządzeń w kreatorze konfiguracji
+CONF_SUBNET = "subnet"
+CONF_DURATION = "duration"
+CONF_DEVICES = "devices"
+DISCOVERY_SCAN_CONCURRENCY = 64
+DISCOVERY_SCAN_TIMEOUT = 2.0  # sekundy na host
+DISCOVERY_MAX_HOSTS = 1024
+DEFAULT_MQTT_LISTEN_DURATION = 35  # dłużej niż interwał odpytywania (30 s)
+
+# Transport HTTP (zapasowy dla MQTT)
+HTTP_CONNECTION_LIMIT = 32
+HTTP_LIMIT_PER_HOST = 2
+HTTP_KEEPALIVE_TIMEOUT = 60  # sekundy
+HTTP_REQUEST_TIMEOUT = 10  # sekundy
+MQTT_STALE_AFTER = 90  # sekundy bez ramki MQTT -> przełączenie na HTTP
+
+# Archiwum surowych ramek CWP (opcja integracji)
+CONF_ARCHIVE = "archive"
+ARCHIVE_DIR = "reqnet_archive"
+ARCHIVE_FLUSH_INTERVAL = 300  # sekundy
+
+# Transport MQTT: klient MQTT Home Assistant lub własne połączenie z brokerem
+CONF_TRANSPORT = "transport"
+TRANSPORT_HA_MQTT = "ha_mqtt"
+TRANSPORT_DIRECT_MQTT = "direct_mqtt"
+CONF_BROKER = "broker"
+CONF_QOS_POLL = "qos_poll"
+CONF_QOS_COMMAND = "qos_command"
+DEFAULT_MQTT_PORT = 1883
+DIRECT_MQTT_CONNECT_TIMEOUT = 10  # sekundy
+DIRECT_MQTT_RECONNECT_MIN = 1  # sekundy
+DIRECT_MQTT_RECONNECT_MAX = 60  # sekundy
+
+# Profilowanie na żądanie (serwis reqnet.profile)
+PROFILE_MAX_DURATION = 600  # sekundy
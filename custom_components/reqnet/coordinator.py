@@ -3,21 +3,51 @@ import logging
 from datetime import timedelta
 import json
 import asyncio
+from collections.abc import Callable
+from time import monotonic, time
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.components import mqtt
 from homeassistant.helpers.device_registry import DeviceInfo
-from .const import DOMAIN
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .const import (
+    DOMAIN,
+    STORAGE_VERSION,
+    STORAGE_KEY_SNAPSHOT,
+    SNAPSHOT_SAVE_DELAY,
+    DEFAULT_FRAME_WINDOW,
+    MQTT_STALE_AFTER,
+    SIGNAL_COORDINATOR_SHUTDOWN,
+)
+from .archive import ReqnetFrameArchive
+from .frame import ReqnetFrame
+from .transport import (
+    ReqnetDirectMqttTransport,
+    ReqnetHttpTransport,
+    ReqnetMqttTransport,
+    ReqnetTransportError,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 UPDATE_INTERVAL = timedelta(seconds=30)
 
 class ReqnetDataCoordinator(DataUpdateCoordinator):
-    """Zarządza pobieraniem danych Reqnet przez MQTT."""
+    """Zarządza pobieraniem danych Reqnet przez MQTT (z zapasowym HTTP)."""
 
-    def __init__(self, hass: HomeAssistant, mac_address_from_config: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mac_address_from_config: str,
+        host: str | None = None,
+        frame_window: float = DEFAULT_FRAME_WINDOW,
+        archive: bool = False,
+        direct_mqtt: dict | None = None,
+    ):
         """Inicjalizacja."""
         self.hass = hass
         
@@ -39,10 +69,40 @@ class ReqnetDataCoordinator(DataUpdateCoordinator):
         self.command_mm_topic = f"{self.mac_for_mqtt_topics}/ManualMode"
         self.response_mm_topic = f"{self.mac_for_mqtt_topics}/ManualModeResult"
 
-        self.data = None 
-        self._unsub_cwp = None
-        self._unsub_am_result = None
-        self._unsub_mm_result = None
+        self.data: ReqnetFrame | None = None 
+        self._seq = 0
+        self._last_live_frame: ReqnetFrame | None = None
+
+        # Transporty: MQTT (podstawowy) i HTTP (zapasowy, tylko gdy znany jest host)
+        # direct_mqtt - parametry własnego połączenia z brokerem zamiast klienta MQTT HA
+        if direct_mqtt:
+            self._mqtt_transport = ReqnetDirectMqttTransport(
+                hass, self.mac_for_mqtt_topics, self._handle_mqtt_message, **direct_mqtt
+            )
+        else:
+            self._mqtt_transport = ReqnetMqttTransport(hass, self.mac_for_mqtt_topics, self._handle_mqtt_message)
+        self._http_transport = ReqnetHttpTransport(hass, host) if host else None
+        self._active_transport = self._mqtt_transport
+        # Okres karencji liczony od startu - do tego czasu brak ramek MQTT nie jest awarią
+        self._last_mqtt_frame_at = monotonic()
+
+        # Ostatnia poprawna ramka CWP zapisywana na dysk (warm start)
+        self._store = Store(hass, STORAGE_VERSION, snapshot_storage_key(self.mac_address))
+        self.restored = False
+        self.restored_at = None
+        self._snapshot_save_pending = False
+
+        # Limit ramek CWP (latest-wins): najwyżej jedna aktualizacja encji na okno
+        self._frame_window = frame_window
+        self._last_frame_at = float("-inf")
+        self._pending_cwp_payload = None
+        self._unsub_frame_flush = None
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+
+        # Archiwum surowych ramek na dysku (opcjonalne)
+        self.archive = ReqnetFrameArchive(hass, self.mac_address) if archive else None
 
         super().__init__(
             hass,
@@ -51,11 +111,12 @@ class ReqnetDataCoordinator(DataUpdateCoordinator):
             update_interval=UPDATE_INTERVAL,
         )
 
+        # Jeden obiekt DeviceInfo współdzielony przez wszystkie encje urządzenia
         self._device_info = DeviceInfo(
             identifiers={(DOMAIN, self.mac_address)},
-            name="Reqnet",
+            name=f"Reqnet Recuperator ({self.mac_address})",
             manufacturer="Reqnet",
-            model=f"Recuperator ({mac_address_from_config})",
+            model="Recuperator",
         )
 
     @property
@@ -63,7 +124,155 @@ class ReqnetDataCoordinator(DataUpdateCoordinator):
         """Zwraca informacje o urządzeniu dla encji."""
         return self._device_info
 
-    async def _handle_mqtt_message(self, msg):
+    async def async_load_snapshot(self) -> bool:
+        """Wczytuje ostatnią zapisaną ramkę CWP, aby encje startowały z ostatnimi wartościami."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as e:
+            # Uszkodzony plik nie może blokować startu integracji
+            _LOGGER.warning(f"Nie udało się wczytać zapisanej ramki dla {self.mac_address}: {e}")
+            return False
+
+        if not stored or not isinstance(stored.get("values"), list):
+            return False
+
+        self.data = ReqnetFrame(stored["values"], 0, stored.get("received_at", 0.0), "snapshot")
+        self.restored = True
+        self.restored_at = stored.get("saved_at")
+        _LOGGER.debug(f"Wczytano zapisaną ramkę CWP dla {self.mac_address} z {self.restored_at}")
+        return True
+
+    @callback
+    def _snapshot_data(self) -> dict:
+        """Dane zapisywane w Store - ostatnia poprawna ramka."""
+        self._snapshot_save_pending = False
+        frame = self._last_live_frame
+        return {
+            "values": frame.as_list(),
+            "received_at": frame.received_at,
+            "saved_at": dt_util.utcnow().isoformat(),
+        }
+
+    @callback
+    def _async_new_frame(self, values: list, source: str) -> ReqnetFrame:
+        """Tworzy ramkę z kolejnym numerem sekwencyjnym."""
+        self._seq += 1
+        return ReqnetFrame(values, self._seq, time(), source)
+
+    @callback
+    def _async_mark_live(self, frame: ReqnetFrame) -> None:
+        """Dane pochodzą z urządzenia - planuje (dławiony) zapis ramki na dysk."""
+        self.restored = False
+        self.restored_at = None
+        self._last_live_frame = frame
+        # async_delay_save przesuwa zapis przy każdym wywołaniu - planujemy go tylko,
+        # gdy żaden nie oczekuje, inaczej ramki co UPDATE_INTERVAL odkładałyby go w nieskończoność
+        if not self._snapshot_save_pending:
+            self._snapshot_save_pending = True
+            self._store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+        if self.archive is not None:
+            self.archive.async_append(frame)
+
+    @callback
+    def _async_set_live_data(self, values: list) -> None:
+        """Ustawia świeże dane z urządzenia (MQTT)."""
+        frame = self._async_new_frame(values, self.response_cwp_topic)
+        self.async_set_updated_data(frame)
+        self._async_mark_live(frame)
+
+    @callback
+    def _ingest_cwp_payload(self, payload) -> None:
+        """Przyjmuje surową ramkę CWP z limitem: najwyżej jedna aktualizacja encji na okno.
+
+        Nadmiarowe ramki są odrzucane przed dekodowaniem JSON - zostaje tylko najnowsza.
+        """
+        self.frames_received += 1
+        self._last_mqtt_frame_at = monotonic()
+
+        if self._active_transport is not self._mqtt_transport:
+            _LOGGER.info(f"MQTT dla {self.mac_address} ponownie dostarcza dane - powrót z HTTP na MQTT")
+            self._active_transport = self._mqtt_transport
+
+        if self._pending_cwp_payload is not None:
+            # Poprzednia oczekująca ramka nigdy nie zostanie zdekodowana
+            self.frames_dropped += 1
+
+        if self._unsub_frame_flush is None and monotonic() - self._last_frame_at >= self._frame_window:
+            self._pending_cwp_payload = None
+            self._process_cwp_payload(payload)
+            return
+
+        self._pending_cwp_payload = payload
+        if self._unsub_frame_flush is None:
+            delay = self._frame_window - (monotonic() - self._last_frame_at)
+            self._unsub_frame_flush = async_call_later(self.hass, max(delay, 0), self._async_flush_pending_frame)
+
+    @callback
+    def _async_flush_pending_frame(self, _now) -> None:
+        """Przetwarza najnowszą ramkę zebraną w trakcie okna."""
+        self._unsub_frame_flush = None
+        payload = self._pending_cwp_payload
+        self._pending_cwp_payload = None
+        if payload is not None:
+            self._process_cwp_payload(payload)
+
+    @callback
+    def _process_cwp_payload(self, payload) -> None:
+        """Dekoduje ramkę CWP i aktualizuje encje."""
+        self._last_frame_at = monotonic()
+        self.frames_processed += 1
+        payload_str = ""
+        try:
+            payload_str = payload.decode('utf-8') if isinstance(payload, bytes) else str(payload)
+            data = json.loads(payload_str)
+
+            if data.get("CurrentWorkParametersResult") is True and "Values" in data:
+                _LOGGER.debug(f"HANDLER MQTT (CWP): Poprawne dane odebrane. Values: {data['Values']}")
+                self._async_set_live_data(data["Values"])
+            else:
+                message = data.get("Message", "Brak wartości 'Values' lub wynik negatywny w odpowiedzi CWP")
+                _LOGGER.error(f"HANDLER MQTT (CWP): Błąd w danych z {self.response_cwp_topic}: {message}. Otrzymane dane: {data}")
+                self.async_set_updated_data(None)
+
+        except json.JSONDecodeError:
+            _LOGGER.error(f"Błąd dekodowania JSON z tematu {self.response_cwp_topic}: {payload_str}")
+            self.async_set_updated_data(None)
+        except Exception as e:
+            _LOGGER.exception(f"Nieoczekiwany błąd podczas przetwarzania wiadomości MQTT z {self.response_cwp_topic}: {e}")
+            self.async_set_updated_data(None)
+
+    @property
+    def ingestion_stats(self) -> dict:
+        """Liczniki ramek CWP (odebrane / przetworzone / odrzucone)."""
+        return {
+            "frame_window": self._frame_window,
+            "frames_received": self.frames_received,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+        }
+
+    async def async_wrap_mqtt_handler(
+        self, wrap: Callable[[Callable[[Any], None]], Callable[[Any], None]] | None
+    ) -> None:
+        """Podmienia callback subskrypcji MQTT na opakowany (profilowanie); None przywraca oryginał.
+
+        Poza profilowaniem subskrypcja wywołuje _handle_mqtt_message bezpośrednio.
+        """
+        handler = self._handle_mqtt_message if wrap is None else wrap(self._handle_mqtt_message)
+        try:
+            await self._mqtt_transport.async_set_message_callback(handler)
+        except ReqnetTransportError as e:
+            # Brakujące subskrypcje zostaną odtworzone przy kolejnym odpytaniu
+            _LOGGER.warning(f"Nie udało się podmienić obsługi wiadomości MQTT dla {self.mac_address}: {e}")
+
+    @callback
+    def _handle_mqtt_message(self, msg) -> None:
+        """Obsługuje wiadomość MQTT synchronicznie w pętli zdarzeń (bez tworzenia zadania na wiadomość)."""
+        # Ścieżka szybka dla CWP - bez logowania i dekodowania każdej ramki
+        if msg.topic == self.response_cwp_topic:
+            self._ingest_cwp_payload(msg.payload)
+            return
+
         _LOGGER.info(f"HANDLER MQTT: Otrzymano wiadomość na temacie '{msg.topic}'")
         payload_str = ""
         try:
@@ -71,145 +280,136 @@ class ReqnetDataCoordinator(DataUpdateCoordinator):
             _LOGGER.debug(f"HANDLER MQTT: Surowy payload dla {msg.topic}: {payload_str}")
             data = json.loads(payload_str)
 
-            if msg.topic == self.response_cwp_topic:
-                if data.get("CurrentWorkParametersResult") is True and "Values" in data:
-                    _LOGGER.info(f"HANDLER MQTT (CWP): Poprawne dane odebrane. Values: {data['Values']}")
-                    self.async_set_updated_data(data["Values"]) 
-                else:
-                    message = data.get("Message", "Brak wartości 'Values' lub wynik negatywny w odpowiedzi CWP")
-                    _LOGGER.error(f"HANDLER MQTT (CWP): Błąd w danych z {self.response_cwp_topic}: {message}. Otrzymane dane: {data}")
-                    self.async_set_updated_data(None)
-                    
-            elif msg.topic == self.response_am_topic:
-                if data.get("AutomaticModeResult") is True:
-                    _LOGGER.info(f"Potwierdzenie ({self.response_am_topic}): Tryb automatyczny włączony. Wiadomość: {data.get('Message', '')}")
-                else:
-                    _LOGGER.warning(f"Potwierdzenie ({self.response_am_topic}): Nie udało się włączyć trybu automatycznego. Wiadomość: {data.get('Message', 'Brak wiadomości')}")
-                    
+            if msg.topic == self.response_am_topic:
+                self._log_command_result("AutomaticMode", data)
             elif msg.topic == self.response_mm_topic:
-                if data.get("ManualModeResult") is True:
-                    _LOGGER.info(f"Potwierdzenie ({self.response_mm_topic}): Tryb ręczny włączony. Wiadomość: {data.get('Message', '')}")
-                else:
-                    _LOGGER.warning(f"Potwierdzenie ({self.response_mm_topic}): Nie udało się włączyć trybu ręcznego. Wiadomość: {data.get('Message', 'Brak wiadomości')}")
-                    
+                self._log_command_result("ManualMode", data)
             else:
                 _LOGGER.warning(f"Otrzymano wiadomość na nieobsługiwanym temacie MQTT: {msg.topic}")
 
         except json.JSONDecodeError:
             _LOGGER.error(f"Błąd dekodowania JSON z tematu {msg.topic}: {payload_str}")
-            if msg.topic == self.response_cwp_topic: 
-                self.async_set_updated_data(None)
         except Exception as e:
             _LOGGER.exception(f"Nieoczekiwany błąd podczas przetwarzania wiadomości MQTT z {msg.topic}: {e}")
-            if msg.topic == self.response_cwp_topic: 
-                self.async_set_updated_data(None)
+
+    def _log_command_result(self, function: str, data: dict) -> bool:
+        """Loguje potwierdzenie polecenia (AutomaticMode / ManualMode). Zwraca wynik."""
+        if data.get(f"{function}Result") is True:
+            _LOGGER.info(f"Potwierdzenie {function} ({self.mac_address}): polecenie wykonane. Wiadomość: {data.get('Message', '')}")
+            return True
+        _LOGGER.warning(f"Potwierdzenie {function} ({self.mac_address}): polecenie nie powiodło się. Wiadomość: {data.get('Message', 'Brak wiadomości')}")
+        return False
+
+    @property
+    def transport_status(self) -> dict:
+        """Aktywny transport i wiek ostatniej ramki MQTT."""
+        return {
+            "active": self._active_transport.name,
+            "http_fallback_available": self._http_transport is not None,
+            "seconds_since_mqtt_frame": round(monotonic() - self._last_mqtt_frame_at, 1),
+        }
 
     async def _async_update_data(self):
         _LOGGER.debug(f"Żądanie danych (CurrentWorkParameters) z Reqnet na temat: {self.request_cwp_topic}")
-        
-        # Subskrypcja CWP
-        if not self._unsub_cwp:
-            try:
-                self._unsub_cwp = await mqtt.async_subscribe(
-                    self.hass, self.response_cwp_topic, self._handle_mqtt_message, qos=0
-                )
-                _LOGGER.debug(f"Zasubskrybowano temat CWP result: {self.response_cwp_topic}")
-            except Exception as e:
-                _LOGGER.error(f"Nie udało się zasubskrybować tematu {self.response_cwp_topic}: {e}")
-                raise UpdateFailed(f"Nie udało się zasubskrybować tematu MQTT CWP: {e}")
-        
-        # Subskrypcja AM
-        if not self._unsub_am_result:
-            try:
-                self._unsub_am_result = await mqtt.async_subscribe(
-                    self.hass, self.response_am_topic, self._handle_mqtt_message, qos=0
-                )
-                _LOGGER.debug(f"Zasubskrybowano temat AM result: {self.response_am_topic}")
-            except Exception as e:
-                _LOGGER.warning(f"Nie udało się zasubskrybować tematu {self.response_am_topic}: {e}")
-        
-        # Subskrypcja MM
-        if not self._unsub_mm_result:
-            try:
-                self._unsub_mm_result = await mqtt.async_subscribe(
-                    self.hass, self.response_mm_topic, self._handle_mqtt_message, qos=0
-                )
-                _LOGGER.debug(f"Zasubskrybowano temat MM result: {self.response_mm_topic}")
-            except Exception as e:
-                _LOGGER.warning(f"Nie udało się zasubskrybować tematu {self.response_mm_topic}: {e}")
-        
+
+        # Żądanie przez MQTT wysyłane zawsze - odpowiedź umożliwia powrót z HTTP na MQTT
+        mqtt_error = None
         try:
-            await mqtt.async_publish(self.hass, self.request_cwp_topic, "", qos=0, retain=False)
-            _LOGGER.debug(f"Wysłano żądanie na {self.request_cwp_topic}")
-            return self.data 
-        except Exception as e:
-            _LOGGER.error(f"Nie udało się wysłać żądania na {self.request_cwp_topic}: {e}")
-            raise UpdateFailed(f"Nie udało się wysłać żądania MQTT CWP: {e}")
+            await self._mqtt_transport.async_run_function("CurrentWorkParameters")
+        except ReqnetTransportError as e:
+            _LOGGER.error(str(e))
+            mqtt_error = e
+
+        mqtt_alive = mqtt_error is None and monotonic() - self._last_mqtt_frame_at < MQTT_STALE_AFTER
+        if mqtt_alive or self._http_transport is None:
+            if mqtt_error is not None:
+                raise UpdateFailed(str(mqtt_error))
+            return self.data
+
+        if self._active_transport is not self._http_transport:
+            _LOGGER.warning(f"Brak danych MQTT z {self.mac_address} - przełączenie na HTTP ({self._http_transport.host})")
+            self._active_transport = self._http_transport
 
-    async def async_set_automatic_mode(self) -> bool:
-        """Ustawia tryb automatyczny."""
-        _LOGGER.info(f"Wysyłanie polecenia AutomaticMode na temat MQTT: {self.command_am_topic}")
         try:
-            await mqtt.async_publish(self.hass, self.command_am_topic, "", qos=0, retain=False)
-            _LOGGER.info(f"Polecenie AutomaticMode wysłane pomyślnie na temat {self.command_am_topic}.")
-            await asyncio.sleep(1) 
-            await self.async_request_refresh()
-            return True
-        except Exception as e:
-            _LOGGER.exception(f"Błąd podczas wysyłania polecenia AutomaticMode przez MQTT: {e}")
+            data = await self._http_transport.async_run_function("CurrentWorkParameters")
+        except ReqnetTransportError as e:
+            raise UpdateFailed(str(e)) from e
+
+        if data.get("CurrentWorkParametersResult") is not True or "Values" not in data:
+            message = data.get("Message", "Brak wartości 'Values' lub wynik negatywny w odpowiedzi CWP")
+            raise UpdateFailed(f"Błąd w danych CWP z HTTP ({self._http_transport.host}): {message}")
+
+        frame = self._async_new_frame(data["Values"], f"http://{self._http_transport.host}")
+        self._async_mark_live(frame)
+        return frame
+
+    async def _async_run_command(self, function: str, params: dict | None = None) -> bool:
+        """Wysyła polecenie aktywnym transportem i odświeża dane."""
+        transport = self._active_transport
+        _LOGGER.info(f"Wysyłanie polecenia {function} ({transport.name}) dla {self.mac_address}, parametry: {params}")
+        try:
+            result = await transport.async_run_function(function, params)
+        except ReqnetTransportError as e:
+            _LOGGER.error(f"Błąd podczas wysyłania polecenia {function}: {e}")
             return False
 
+        # HTTP zwraca wynik od razu, MQTT potwierdza asynchronicznie na temacie *Result
+        if result is not None and not self._log_command_result(function, result):
+            return False
+
+        _LOGGER.info(f"Polecenie {function} wysłane pomyślnie ({transport.name}).")
+        await asyncio.sleep(1) 
+        await self.async_request_refresh()
+        return True
+
+    async def async_set_automatic_mode(self) -> bool:
+        """Ustawia tryb automatyczny."""
+        return await self._async_run_command("AutomaticMode")
+
     async def async_set_manual_mode(self, airflow_value: int = None, air_extraction_value: int = None) -> bool:
         """Ustawia tryb ręczny z zadanymi wartościami nawiewu i wyciągu."""
-        _LOGGER.info(f"Wysyłanie polecenia ManualMode na temat MQTT: {self.command_mm_topic}")
-        
         # Jeśli nie podano wartości, użyj aktualnych wartości z API lub wartości domyślnych
         if airflow_value is None or air_extraction_value is None:
             if self.data and len(self.data) > 6:
                 # Użyj aktualnych wartości z API Index 6 i 7 (Python index 5 i 6)
                 current_airflow = self.data[5] if self.data[5] is not None else 200
                 current_extraction = self.data[6] if self.data[6] is not None else 200
-                airflow_value = airflow_value or current_airflow
-                air_extraction_value = air_extraction_value or current_extraction
             else:
                 # Wartości domyślne jeśli brak danych
-                airflow_value = airflow_value or 200
-                air_extraction_value = air_extraction_value or 200
+                current_airflow = 200
+                current_extraction = 200
+            # Jawnie podane 0 jest poprawną wartością - zastępujemy tylko brakujące
+            if airflow_value is None:
+                airflow_value = current_airflow
+            if air_extraction_value is None:
+                air_extraction_value = current_extraction
         
-        # Przygotuj payload JSON z parametrami
-        payload = {
+        # Parametry polecenia (JSON dla MQTT, query string dla HTTP)
+        params = {
             "AirflowValue": airflow_value,
             "ValueOfAirExtraction": air_extraction_value
         }
-        
-        try:
-            payload_json = json.dumps(payload)
-            _LOGGER.info(f"Wysyłanie ManualMode z parametrami: {payload_json}")
-            
-            await mqtt.async_publish(self.hass, self.command_mm_topic, payload_json, qos=0, retain=False)
-            _LOGGER.info(f"Polecenie ManualMode wysłane pomyślnie na temat {self.command_mm_topic}.")
-            await asyncio.sleep(1) 
-            await self.async_request_refresh()
-            return True
-        except Exception as e:
-            _LOGGER.exception(f"Błąd podczas wysyłania polecenia ManualMode przez MQTT: {e}")
-            return False
+        return await self._async_run_command("ManualMode", params)
 
     async def async_shutdown(self):
         """Zamyka połączenia MQTT."""
         _LOGGER.debug("Anulowanie subskrypcji MQTT dla Reqnet.")
-        
-        if self._unsub_cwp:
-            self._unsub_cwp()
-            self._unsub_cwp = None
-            _LOGGER.debug(f"Anulowano subskrypcję tematu: {self.response_cwp_topic}")
-            
-        if self._unsub_am_result:
-            self._unsub_am_result()
-            self._unsub_am_result = None
-            _LOGGER.debug(f"Anulowano subskrypcję tematu: {self.response_am_topic}")
-            
-        if self._unsub_mm_result:
-            self._unsub_mm_result()
-            self._unsub_mm_result = None
-            _LOGGER.debug(f"Anulowano subskrypcję tematu: {self.response_mm_topic}")
\ No newline at end of file
+
+        # Zamyka strumienie WebSocket tego koordynatora (ich nasłuch trzymałby odpytywanie)
+        async_dispatcher_send(self.hass, SIGNAL_COORDINATOR_SHUTDOWN.format(self.mac_address), self)
+        # Zatrzymuje odpytywanie i oczekujące odświeżenia (debouncer)
+        await super().async_shutdown()
+
+        if self._unsub_frame_flush:
+            self._unsub_frame_flush()
+            self._unsub_frame_flush = None
+        self._pending_cwp_payload = None
+
+        await self._mqtt_transport.async_shutdown()
+
+        if self.archive is not None:
+            await self.archive.async_shutdown()
+
+def snapshot_storage_key(mac_address: str) -> str:
+    """Klucz Store dla zapisanej ramki danego urządzenia."""
+    return f"{STORAGE_KEY_SNAPSHOT}_{mac_address.lower()}"
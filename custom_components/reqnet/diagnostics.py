@@ -0,0 +1,31 @@
+"""Diagnostics support for Reqnet Recuperator."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_MAC, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_BROKER
+from .coordinator import ReqnetDataCoordinator
+
+TO_REDACT = {CONF_HOST, CONF_MAC, CONF_BROKER, CONF_USERNAME, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: ReqnetDataCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "restored": coordinator.restored,
+        "ingestion": coordinator.ingestion_stats,
+        "transport": coordinator.transport_status,
+        "frame": repr(coordinator.data),
+        "data": coordinator.data.as_list() if coordinator.data is not None else None,
+    }
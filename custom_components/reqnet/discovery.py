@@ -0,0 +1,89 @@
+"""Wykrywanie rekuperatorów Reqnet w sieci lokalnej (skan HTTP i nasłuch MQTT)."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+
+import aiohttp
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    API_PATH_API,
+    DISCOVERY_MAX_HOSTS,
+    DISCOVERY_SCAN_CONCURRENCY,
+    DISCOVERY_SCAN_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+MQTT_DISCOVERY_TOPIC = "+/CurrentWorkParametersResult"
+
+
+async def async_probe_host(
+    session: aiohttp.ClientSession, host: str, timeout: float
+) -> str | None:
+    """Zwraca adres MAC rekuperatora pod danym adresem lub None."""
+    url = f"http://{host}{API_PATH_API}"
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        api_data = await response.json(content_type=None)
+
+    if not isinstance(api_data, dict) or not api_data.get("APIResult") or "MAC" not in api_data:
+        return None
+    return api_data["MAC"]
+
+
+async def async_scan_subnet(
+    hass: HomeAssistant,
+    subnet: str,
+    concurrency: int = DISCOVERY_SCAN_CONCURRENCY,
+    timeout: float = DISCOVERY_SCAN_TIMEOUT,
+) -> dict[str, str]:
+    """Skanuje podsieć równoległymi zapytaniami HTTP. Zwraca {MAC: host}.
+
+    Rzuca ValueError dla niepoprawnej lub zbyt dużej podsieci.
+    """
+    network = ipaddress.ip_network(subnet, strict=False)
+    if network.num_addresses > DISCOVERY_MAX_HOSTS + 2:
+        raise ValueError(f"Podsieć {subnet} jest zbyt duża do skanowania")
+
+    # Współdzielona sesja HA - połączenia z puli, bez tworzenia sesji na host
+    session = async_get_clientsession(hass)
+    semaphore = asyncio.Semaphore(concurrency)
+    found: dict[str, str] = {}
+
+    async def _probe(host: str) -> None:
+        async with semaphore:
+            try:
+                mac_address = await async_probe_host(session, host, timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                return
+        if mac_address:
+            _LOGGER.debug(f"Wykryto rekuperator Reqnet {mac_address} pod adresem {host}")
+            found[mac_address] = host
+
+    hosts = [str(host) for host in network.hosts()] or [str(network.network_address)]
+    await asyncio.gather(*(_probe(host) for host in hosts))
+    return found
+
+
+async def async_listen_mqtt(hass: HomeAssistant, duration: float) -> set[str]:
+    """Nasłuchuje odpowiedzi CWP dowolnych urządzeń. Zwraca zbiór adresów MAC z tematów."""
+    found: set[str] = set()
+
+    @callback
+    def _message_received(msg) -> None:
+        found.add(msg.topic.split("/", 1)[0])
+
+    unsubscribe = await mqtt.async_subscribe(
+        hass, MQTT_DISCOVERY_TOPIC, _message_received, qos=0
+    )
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        unsubscribe()
+    return found
@@ -0,0 +1,43 @@
+"""Wspólna baza encji Reqnet."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import ReqnetDataCoordinator
+
+
+class ReqnetEntity(CoordinatorEntity[ReqnetDataCoordinator]):
+    """Encja powiązana z urządzeniem Reqnet; pomija powiadomienia bez nowej ramki."""
+
+    def __init__(
+        self,
+        coordinator: ReqnetDataCoordinator,
+        description: EntityDescription,
+    ) -> None:
+        """Inicjalizacja."""
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        # Unikalne ID dla encji
+        self._attr_unique_id = f"{coordinator.mac_address.replace(':', '').lower()}_{description.key}"
+
+        # Informacje o urządzeniu - jeden obiekt koordynatora dla wszystkich encji urządzenia
+        self._attr_device_info = coordinator.device_info
+
+        # (numer ramki, wynik ostatniej aktualizacji) ostatnio zapisanego stanu
+        self._last_handled: tuple[int | None, bool] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Zapisuje stan tylko dla nowej ramki lub zmiany dostępności."""
+        frame = self.coordinator.data
+        handled = (
+            frame.seq if frame is not None else None,
+            self.coordinator.last_update_success,
+        )
+        if handled == self._last_handled:
+            return
+        self._last_handled = handled
+        super()._handle_coordinator_update()
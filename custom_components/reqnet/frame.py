@@ -0,0 +1,111 @@
+"""Niezmienna ramka danych CWP."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+import math
+from typing import Any
+
+
+def _is_number(value: Any) -> bool:
+    """Liczba zapisywana w tablicy array('d') (bool zachowuje swój typ)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_float(value: Any) -> float:
+    """Wartość z tablicy Values jako float (NaN dla braku lub wartości nieliczbowej)."""
+    if _is_number(value):
+        return float(value)
+    return math.nan
+
+
+def _from_float(value: float) -> int | float | None:
+    """Odwrotność _to_float - liczby całkowite wracają jako int, NaN jako None."""
+    if value != value:
+        return None
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+class ReqnetFrame(Sequence):
+    """Ramka CWP: wartości w tablicy array('d'), numer sekwencyjny, czas odbioru i źródło.
+
+    Indeksowanie działa jak na liście Values (brak wartości -> None), więc
+    konsumenci mogą czytać ramkę bez kopiowania. Wartości nieliczbowe (np. tekst
+    modelu lub wersji firmware) trzymane są w rzadkim słowniku {indeks: wartość}
+    i zwracane bez zmian; w tablicy (i w `values`) mają NaN. Numer `seq` rośnie monotonicznie
+    w obrębie koordynatora - pozwala wykryć pominięte ramki i pominąć ponowne
+    przetwarzanie tej samej ramki.
+    """
+
+    __slots__ = ("_values", "_extra", "seq", "received_at", "source")
+
+    _values: array
+    _extra: dict[int, Any] | None
+    seq: int
+    received_at: float
+    source: str
+
+    def __init__(
+        self, values: Iterable[Any], seq: int, received_at: float, source: str
+    ) -> None:
+        """Inicjalizacja."""
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        extra = {
+            index: value
+            for index, value in enumerate(values)
+            if value is not None and not _is_number(value)
+        }
+        object.__setattr__(self, "_values", array("d", (_to_float(value) for value in values)))
+        object.__setattr__(self, "_extra", extra or None)
+        object.__setattr__(self, "seq", seq)
+        object.__setattr__(self, "received_at", received_at)
+        object.__setattr__(self, "source", source)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Ramka jest niezmienna."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Ramka jest niezmienna."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __len__(self) -> int:
+        """Liczba wartości."""
+        return len(self._values)
+
+    def __getitem__(self, index):
+        """Wartość pod indeksem (lub lista dla wycinka)."""
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self._values)))]
+        value = self._values[index]
+        if self._extra is not None and value != value:
+            return self._extra.get(index % len(self._values), None)
+        return _from_float(value)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iteracja po wartościach."""
+        if self._extra is None:
+            return (_from_float(value) for value in self._values)
+        extra = self._extra
+        return (
+            extra.get(index) if value != value else _from_float(value)
+            for index, value in enumerate(self._values)
+        )
+
+    def __repr__(self) -> str:
+        """Reprezentacja do logów."""
+        return (
+            f"ReqnetFrame(seq={self.seq}, source={self.source!r}, "
+            f"received_at={self.received_at}, values={len(self._values)})"
+        )
+
+    @property
+    def values(self) -> memoryview:
+        """Surowe wartości float (NaN = brak) jako widok tylko do odczytu - bez kopiowania."""
+        return memoryview(self._values).toreadonly()
+
+    def as_list(self) -> list[Any]:
+        """Wartości jako lista (np. do zapisu JSON)."""
+        return list(self)
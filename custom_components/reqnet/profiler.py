@@ -0,0 +1,234 @@
+"""Profilowanie integracji na żądanie (serwis reqnet.profile).
+
+Instrumentacja jest zakładana tylko na czas pomiaru (podmiana atrybutów klas,
+callbacku subskrypcji MQTT lub włączenie cProfile) i zdejmowana po nim - poza
+pomiarem nie ma narzutu.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from collections.abc import Callable
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+from time import perf_counter
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .binary_sensor import ReqnetBinarySensor
+from .const import DOMAIN
+from .coordinator import ReqnetDataCoordinator
+from .entity import ReqnetEntity
+from .sensor import ReqnetSensor
+
+PROFILE_ACTIVE_KEY = f"{DOMAIN}_profile_active"
+PROFILE_MODE_TIMING = "timing"
+PROFILE_MODE_CPROFILE = "cprofile"
+
+# Gorące ścieżki mierzone w trybie timing (obsługa wiadomości MQTT - osobno,
+# przez podmianę callbacku subskrypcji, bo subskrypcja trzyma metodę związaną)
+MQTT_HANDLER_LABEL = "ReqnetDataCoordinator._handle_mqtt_message"
+TIMED_TARGETS: tuple[tuple[type, str], ...] = (
+    (ReqnetDataCoordinator, "_async_update_data"),
+    (ReqnetSensor, "native_value"),
+    (ReqnetBinarySensor, "is_on"),
+    (ReqnetEntity, "async_write_ha_state"),
+)
+
+# Katalog integracji - filtr statystyk cProfile
+_PACKAGE_DIR = os.path.dirname(__file__)
+
+
+def _recorder(stats: dict[str, list], label: str) -> Callable[[float], None]:
+    """Funkcja dopisująca pomiar do statystyk pod etykietą."""
+    # [liczba wywołań, czas łączny, czas maksymalny]
+    entry = stats.setdefault(label, [0, 0.0, 0.0])
+
+    def _record(elapsed: float) -> None:
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+    return _record
+
+
+def _timed(original: Callable, _record: Callable[[float], None]) -> Callable:
+    """Wersja funkcji mierząca czas wywołania (znacznik @callback kopiowany przez wraps)."""
+    if inspect.iscoroutinefunction(original):
+
+        @functools.wraps(original)
+        async def replacement(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                _record(perf_counter() - start)
+
+        return replacement
+
+    @functools.wraps(original)
+    def replacement(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            _record(perf_counter() - start)
+
+    return replacement
+
+
+def _instrument(cls: type, name: str, stats: dict[str, list]) -> Callable[[], None]:
+    """Podmienia atrybut klasy na wersję mierzącą czas. Zwraca funkcję przywracającą."""
+    had_own = name in cls.__dict__
+    original = cls.__dict__[name] if had_own else getattr(cls, name)
+    _record = _recorder(stats, f"{cls.__name__}.{name}")
+
+    if isinstance(original, property):
+        fget = original.fget
+
+        def timed_get(self):
+            start = perf_counter()
+            try:
+                return fget(self)
+            finally:
+                _record(perf_counter() - start)
+
+        replacement: Any = property(timed_get, original.fset, original.fdel, original.__doc__)
+    else:
+        replacement = _timed(original, _record)
+
+    setattr(cls, name, replacement)
+
+    def restore() -> None:
+        if had_own:
+            setattr(cls, name, original)
+        else:
+            delattr(cls, name)
+
+    return restore
+
+
+def _timing_summary(stats: dict[str, list]) -> dict[str, dict[str, float]]:
+    """Podsumowanie pomiarów w milisekundach."""
+    return {
+        label: {
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "avg_ms": round(total * 1000 / calls, 4) if calls else 0.0,
+            "max_ms": round(maximum * 1000, 3),
+        }
+        for label, (calls, total, maximum) in stats.items()
+    }
+
+
+def _cprofile_summary(stats: pstats.Stats, limit: int = 30) -> list[dict[str, Any]]:
+    """Najkosztowniejsze funkcje integracji (czas łączny)."""
+    rows = [
+        {
+            "function": f"{os.path.relpath(filename, _PACKAGE_DIR)}:{line}({function})",
+            "calls": calls,
+            "total_ms": round(total_time * 1000, 3),
+            "cumulative_ms": round(cumulative_time * 1000, 3),
+        }
+        for (filename, line, function), (_, calls, total_time, cumulative_time, _) in stats.stats.items()
+        if filename.startswith(_PACKAGE_DIR)
+    ]
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _write_cprofile(
+    profiler: cProfile.Profile, stats_path: str, summary_path: str
+) -> list[dict[str, Any]]:
+    """Zapisuje plik .prof i tekstowe podsumowanie modułów integracji; zwraca podsumowanie (executor)."""
+    profiler.dump_stats(stats_path)
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    summary = _cprofile_summary(stats)
+    stats.sort_stats("cumulative").print_stats(_PACKAGE_DIR.replace("\\", "\\\\"), 50)
+    with open(summary_path, "w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
+    return summary
+
+
+def _write_timing(summary: dict[str, Any], stats_path: str, summary_path: str) -> None:
+    """Zapisuje statystyki JSON i tekstowe podsumowanie (executor)."""
+    with open(stats_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+    with open(summary_path, "w", encoding="utf-8") as file:
+        for label, row in sorted(summary.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            file.write(
+                f"{label:55} calls={row['calls']:8} total={row['total_ms']:10.3f} ms "
+                f"avg={row['avg_ms']:9.4f} ms max={row['max_ms']:9.3f} ms\n"
+            )
+
+
+async def async_profile(hass: HomeAssistant, duration: float, mode: str) -> dict[str, Any]:
+    """Mierzy gorące ścieżki integracji przez `duration` sekund i zapisuje wyniki w katalogu konfiguracji."""
+    if hass.data.get(PROFILE_ACTIVE_KEY):
+        raise HomeAssistantError("Profilowanie Reqnet jest już w toku")
+    hass.data[PROFILE_ACTIVE_KEY] = True
+
+    timestamp = dt_util.utcnow().strftime("%Y%m%d_%H%M%S")
+    base_path = hass.config.path(f"reqnet_profile_{timestamp}")
+    summary_path = f"{base_path}.txt"
+
+    try:
+        if mode == PROFILE_MODE_CPROFILE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Inny profiler (np. integracja profiler) jest już aktywny
+                raise HomeAssistantError(f"Nie można uruchomić cProfile: {e}") from e
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                profiler.disable()
+
+            stats_path = f"{base_path}.prof"
+            summary: Any = await hass.async_add_executor_job(
+                _write_cprofile, profiler, stats_path, summary_path
+            )
+        else:
+            stats: dict[str, list] = {}
+            record_mqtt = _recorder(stats, MQTT_HANDLER_LABEL)
+            coordinators = [
+                coordinator
+                for coordinator in hass.data.get(DOMAIN, {}).values()
+                if isinstance(coordinator, ReqnetDataCoordinator)
+            ]
+            restorers = [_instrument(cls, name, stats) for cls, name in TIMED_TARGETS]
+            try:
+                for coordinator in coordinators:
+                    await coordinator.async_wrap_mqtt_handler(
+                        lambda handler: _timed(handler, record_mqtt)
+                    )
+                await asyncio.sleep(duration)
+            finally:
+                for coordinator in coordinators:
+                    await coordinator.async_wrap_mqtt_handler(None)
+                for restore in reversed(restorers):
+                    restore()
+
+            stats_path = f"{base_path}.json"
+            summary = _timing_summary(stats)
+            await hass.async_add_executor_job(_write_timing, summary, stats_path, summary_path)
+    finally:
+        hass.data.pop(PROFILE_ACTIVE_KEY, None)
+
+    return {
+        "mode": mode,
+        "duration": duration,
+        "stats_file": stats_path,
+        "summary_file": summary_path,
+        "summary": summary,
+    }
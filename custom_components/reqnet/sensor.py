@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -12,7 +13,6 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.const import (
     UnitOfTemperature,
     PERCENTAGE,
@@ -23,6 +23,7 @@ from homeassistant.const import (
 # Upewnij się, że DOMAIN i ReqnetDataCoordinator są poprawnie zdefiniowane/importowane
 from .const import DOMAIN # Zakładam, że DOMAIN jest zdefiniowany w .const
 from .coordinator import ReqnetDataCoordinator # Zakładam, że koordynator jest w .coordinator
+from .entity import ReqnetEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -97,6 +98,63 @@ SENSOR_DEFINITIONS: list[tuple[int, str, str | None, str | None, SensorDeviceCla
     # (21, "Wydajność Kominek", PERCENTAGE, "mdi:fireplace", None, None), # API Index 22
 ]
 
+# Mapowanie wartości dla specyficznych sensorów: indeks -> (mapa wartości, tekst domyślny)
+VALUE_MAPS: dict[int, tuple[dict[int, str], str]] = {
+    # API Index 1 (Python index 0): Status urządzenia
+    0: ({1: "Włączone"}, "Wyłączone"),
+    # API Index 10 (Python index 9): Status harmonogramu
+    9: ({1: "Aktywny"}, "Nieaktywny"),
+    # API Index 11 (Python index 10): Tryb pracy
+    10: (
+        {
+            1: "Szybkie grzanie", 2: "Szybkie chłodzenie", 3: "Urlop",
+            4: "Przewietrzanie", 5: "Oczyszczanie", 6: "Kominek",
+            8: "Tryb ręczny", 9: "Tryb inteligentny", 10: "Tryb pomiaru wydajności",
+        },
+        "Nieznany tryb ({})",
+    ),
+    # API Index 14 (Python index 13): Status funkcji równoległej (grzanie/chłodzenie)
+    13: ({0: "Nieaktywna", 1: "Grzanie", 2: "Chłodzenie"}, "Nieznany status ({})"),
+    # API Index 40 (Python index 39): Wartość ByPassu
+    39: (
+        {
+            0: "Zamknięty (ręcznie)", 1: "Otwarty (ręcznie)",
+            2: "Zamknięty (auto)", 3: "Otwarty (auto)",
+        },
+        "Nieznany status ({})",
+    ),
+    # API Index 72 (Python index 71): Detekcja wilgotności
+    71: ({1: "Aktywna"}, "Nieaktywna"),
+    # API Index 73 (Python index 72): Status nagrzewnicy wstępnej
+    72: ({1: "Aktywna"}, "Nieaktywna"),
+    # API Index 87 (Python index 86): Typ montażu
+    86: ({1: "Lewy", 2: "Prawy"}, "Nieznany ({})"),
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReqnetSensorEntityDescription(SensorEntityDescription):
+    """Opis sensora Reqnet - wspólny dla wszystkich urządzeń."""
+
+    index: int
+    value_map: tuple[dict[int, str], str] | None = None
+
+
+# Opisy budowane raz przy imporcie modułu i współdzielone przez encje wszystkich urządzeń
+SENSOR_DESCRIPTIONS: tuple[ReqnetSensorEntityDescription, ...] = tuple(
+    ReqnetSensorEntityDescription(
+        key=f"value_{index}",
+        index=index,
+        name=f"Reqnet {name_suffix}",
+        icon=icon,
+        native_unit_of_measurement=unit,
+        device_class=dev_class,
+        entity_category=entity_cat,
+        value_map=VALUE_MAPS.get(index),
+    )
+    for index, name_suffix, unit, icon, dev_class, entity_cat in SENSOR_DEFINITIONS
+)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -105,127 +163,38 @@ async def async_setup_entry(
     """Set up Reqnet sensor platform."""
     coordinator: ReqnetDataCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities_to_add = []
-    for index, name_suffix, unit, icon, dev_class, entity_cat in SENSOR_DEFINITIONS:
-        entities_to_add.append(
-            ReqnetSensor(
-                coordinator=coordinator,
-                index=index,
-                name_suffix=name_suffix,
-                unit=unit,
-                icon=icon,
-                device_class=dev_class,
-                entity_category=entity_cat,
-            )
-        )
-    async_add_entities(entities_to_add)
-
-
-class ReqnetSensor(CoordinatorEntity[ReqnetDataCoordinator], SensorEntity):
+    async_add_entities(
+        ReqnetSensor(coordinator, description) for description in SENSOR_DESCRIPTIONS
+    )
+
+
+class ReqnetSensor(ReqnetEntity, SensorEntity):
     _attr_has_entity_name = True # Ustawia, jeśli chcesz, aby nazwa urządzenia była częścią nazwy sensora
-    
-
-    def __init__(
-        self,
-        coordinator: ReqnetDataCoordinator,
-        index: int,
-        name_suffix: str,
-        unit: str | None,
-        icon: str | None,
-        device_class: SensorDeviceClass | None = None,
-        entity_category: EntityCategory | None = None, # POPRAWIONE TYPOWANIE
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._index = index
-
-        display_name = f"Reqnet {name_suffix}"
-
-        self.entity_description = SensorEntityDescription(
-            key=f"value_{self._index}",
-            name=display_name,
-            icon=icon,
-            native_unit_of_measurement=unit,
-            device_class=device_class,
-            entity_category=entity_category, # Tutaj zostanie przekazana poprawna instancja EntityCategory lub None
-        )
-
-        # Unikalne ID dla encji
-        self._attr_unique_id = f"{coordinator.mac_address.replace(':', '').lower()}_{self.entity_description.key}"
-
-        # Informacje o urządzeniu (wspólne dla wszystkich sensorów tego urządzenia)
-        # Można to ulepszyć, np. dynamicznie ustawiając model na podstawie danych z API (np. indeks 15)
-        # w metodzie update koordynatora lub przy pierwszym odczycie, jeśli to bezpieczne.
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, coordinator.mac_address)},
-            "name": f"Reqnet Recuperator ({coordinator.mac_address})",
-            "manufacturer": "Reqnet",
-            "model": "Recuperator", # Można spróbować odczytać API Index 16 (Python index 15)
-        }
-        # Przykład dynamicznego ustawiania modelu, jeśli dane są już dostępne:
-        # if coordinator.data and len(coordinator.data) > 15 and coordinator.data[15] is not None:
-        #     self._attr_device_info["model"] = f"Recuperator Model {coordinator.data[15]}"
-        
-        # Informacje o urządzeniu (wspólne dla wszystkich sensorów tego urządzenia)
-        
+
+    entity_description: ReqnetSensorEntityDescription
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Oznacza wartości wczytane z zapisanej ramki (przed pierwszym odczytem na żywo)."""
+        if self.coordinator.restored:
+            return {"restored": True, "restored_at": self.coordinator.restored_at}
+        return None
 
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        if (
-            self.coordinator.data is None
-            or not isinstance(self.coordinator.data, list)
-            or self._index >= len(self.coordinator.data)
-        ):
-            # _LOGGER.debug( # Zmieniono na debug, aby nie spamować logów przy chwilowych problemach
-            #    f"Data for sensor {self.entity_description.name} (index {self._index}) is unavailable or out of bounds."
-            # )
+        data = self.coordinator.data
+        index = self.entity_description.index
+        if data is None or index >= len(data):
             return None # Zgodnie z dokumentacją HA, powinno zwracać None lub STATE_UNAVAILABLE
 
-        value = self.coordinator.data[self._index]
-
-        # Mapowanie wartości dla specyficznych sensorów
-        # API Index 1 (Python index 0): Status urządzenia
-        if self._index == 0:
-            return "Włączone" if value == 1 else "Wyłączone"
-        
-        # API Index 10 (Python index 9): Status harmonogramu
-        if self._index == 9:
-            return "Aktywny" if value == 1 else "Nieaktywny"
-
-        # API Index 11 (Python index 10): Tryb pracy
-        if self._index == 10:
-            modes = {
-                1: "Szybkie grzanie", 2: "Szybkie chłodzenie", 3: "Urlop",
-                4: "Przewietrzanie", 5: "Oczyszczanie", 6: "Kominek",
-                8: "Tryb ręczny", 9: "Tryb inteligentny", 10: "Tryb pomiaru wydajności",
-            }
-            return modes.get(value, f"Nieznany tryb ({value})")
-
-        # API Index 14 (Python index 13): Status funkcji równoległej (grzanie/chłodzenie)
-        if self._index == 13:
-            statuses = {0: "Nieaktywna", 1: "Grzanie", 2: "Chłodzenie"}
-            return statuses.get(value, f"Nieznany status ({value})")
-
-        # API Index 40 (Python index 39): Wartość ByPassu
-        if self._index == 39:
-            bypass_status = {
-                0: "Zamknięty (ręcznie)", 1: "Otwarty (ręcznie)",
-                2: "Zamknięty (auto)", 3: "Otwarty (auto)",
-            }
-            return bypass_status.get(value, f"Nieznany status ({value})")
-
-        # API Index 72 (Python index 71): Detekcja wilgotności
-        if self._index == 71:
-            return "Aktywna" if value == 1 else "Nieaktywna"
-
-        # API Index 73 (Python index 72): Status nagrzewnicy wstępnej
-        if self._index == 72:
-            return "Aktywna" if value == 1 else "Nieaktywna"
-
-        # API Index 87 (Python index 86): Typ montażu
-        if self._index == 86:
-            types = {1: "Lewy", 2: "Prawy"}
-            return types.get(value, f"Nieznany ({value})")
-
-        return value
\ No newline at end of file
+        value = data[index]
+
+        value_map = self.entity_description.value_map
+        if value_map is None:
+            return value
+
+        mapping, default = value_map
+        if value in mapping:
+            return mapping[value]
+        return default.format(value)
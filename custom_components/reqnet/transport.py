@@ -0,0 +1,359 @@
+"""Transporty komunikacji z rekuperatorem Reqnet (MQTT, własny klient MQTT i HTTP)."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+import aiohttp
+import aiomqtt
+
+from homeassistant.components import mqtt
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import (
+    DOMAIN,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_REQUEST_TIMEOUT,
+    DIRECT_MQTT_CONNECT_TIMEOUT,
+    DIRECT_MQTT_RECONNECT_MIN,
+    DIRECT_MQTT_RECONNECT_MAX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HTTP_SESSION_KEY = f"{DOMAIN}_http_session"
+HTTP_SESSION_UNSUB_KEY = f"{DOMAIN}_http_session_unsub"
+
+# Funkcje API, na których wyniki nasłuchujemy przez MQTT ({MAC}/{funkcja}Result)
+RESULT_FUNCTIONS = ("CurrentWorkParameters", "AutomaticMode", "ManualMode")
+
+
+class ReqnetTransportError(Exception):
+    """Błąd transportu (brak połączenia, nieudane wysłanie lub odczyt)."""
+
+
+class ReqnetTransport(ABC):
+    """Transport wywołujący funkcje API rekuperatora (RunFunction)."""
+
+    name = "base"
+
+    @abstractmethod
+    async def async_run_function(
+        self, function: str, params: dict[str, Any] | None = None
+    ) -> dict | None:
+        """Wywołuje funkcję API.
+
+        Zwraca zdekodowaną odpowiedź lub None, jeśli odpowiedź przychodzi
+        asynchronicznie (MQTT). Rzuca ReqnetTransportError przy błędzie.
+        """
+
+    async def async_shutdown(self) -> None:
+        """Zwalnia zasoby transportu."""
+
+
+class ReqnetMqttTransport(ReqnetTransport):
+    """Transport przez współdzielony klient MQTT Home Assistant."""
+
+    name = "mqtt"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mac_for_mqtt_topics: str,
+        message_callback: Callable[[Any], None],
+    ) -> None:
+        """Inicjalizacja."""
+        self.hass = hass
+        self._mac = mac_for_mqtt_topics
+        self._message_callback = message_callback
+        self._unsubscribers: dict[str, Callable[[], None]] = {}
+
+    def command_topic(self, function: str) -> str:
+        """Temat polecenia dla funkcji API."""
+        return f"{self._mac}/{function}"
+
+    def result_topic(self, function: str) -> str:
+        """Temat odpowiedzi dla funkcji API."""
+        return f"{self._mac}/{function}Result"
+
+    async def _async_ensure_subscribed(self) -> None:
+        """Subskrybuje tematy odpowiedzi (tylko brakujące)."""
+        for function in RESULT_FUNCTIONS:
+            if function in self._unsubscribers:
+                continue
+            topic = self.result_topic(function)
+            # Ramki CWP bez dekodowania UTF-8 - nadmiarowe są odrzucane jeszcze przed nim
+            encoding = None if function == "CurrentWorkParameters" else "utf-8"
+            try:
+                self._unsubscribers[function] = await mqtt.async_subscribe(
+                    self.hass, topic, self._message_callback, qos=0, encoding=encoding
+                )
+                _LOGGER.debug(f"Zasubskrybowano temat: {topic}")
+            except Exception as e:
+                if function == "CurrentWorkParameters":
+                    raise ReqnetTransportError(f"Nie udało się zasubskrybować tematu MQTT {topic}: {e}") from e
+                _LOGGER.warning(f"Nie udało się zasubskrybować tematu {topic}: {e}")
+
+    async def async_set_message_callback(self, message_callback: Callable[[Any], None]) -> None:
+        """Podmienia message_callback i przenosi na niego istniejące subskrypcje.
+
+        Nowe subskrypcje powstają przed anulowaniem starych - wiadomość może
+        przyjść podwójnie, ale nie zginie.
+        """
+        self._message_callback = message_callback
+        if not self._unsubscribers:
+            return
+        previous, self._unsubscribers = self._unsubscribers, {}
+        try:
+            await self._async_ensure_subscribed()
+        finally:
+            for unsubscribe in previous.values():
+                unsubscribe()
+
+    async def async_run_function(
+        self, function: str, params: dict[str, Any] | None = None
+    ) -> dict | None:
+        """Publikuje polecenie - odpowiedź trafi do message_callback."""
+        await self._async_ensure_subscribed()
+        topic = self.command_topic(function)
+        payload = json.dumps(params) if params else ""
+        try:
+            await mqtt.async_publish(self.hass, topic, payload, qos=0, retain=False)
+        except Exception as e:
+            raise ReqnetTransportError(f"Nie udało się wysłać żądania MQTT na {topic}: {e}") from e
+        _LOGGER.debug(f"Wysłano żądanie na {topic}")
+        return None
+
+    async def async_shutdown(self) -> None:
+        """Anuluje subskrypcje MQTT."""
+        for function, unsubscribe in self._unsubscribers.items():
+            unsubscribe()
+            _LOGGER.debug(f"Anulowano subskrypcję tematu: {self.result_topic(function)}")
+        self._unsubscribers.clear()
+
+
+class DirectMqttMessage(NamedTuple):
+    """Wiadomość z własnego klienta MQTT (ten sam kształt co wiadomość z HA: topic, payload)."""
+
+    topic: str
+    payload: bytes
+
+
+class ReqnetDirectMqttTransport(ReqnetMqttTransport):
+    """Transport przez własne połączenie MQTT (niezależne od klienta MQTT Home Assistant).
+
+    Sesja trwała (clean_session=False, stały identyfikator klienta), QoS osobno
+    dla odpytywania i poleceń, automatyczne ponowne łączenie z ponowną subskrypcją.
+    """
+
+    name = "direct_mqtt"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mac_for_mqtt_topics: str,
+        message_callback: Callable[[Any], None],
+        broker: str,
+        port: int = 1883,
+        username: str | None = None,
+        password: str | None = None,
+        qos_poll: int = 0,
+        qos_command: int = 1,
+    ) -> None:
+        """Inicjalizacja."""
+        super().__init__(hass, mac_for_mqtt_topics, message_callback)
+        self._broker = broker
+        self._port = port
+        self._username = username or None
+        self._password = password or None
+        self._qos_poll = qos_poll
+        self._qos_command = qos_command
+        self._client: aiomqtt.Client | None = None
+        self._connected = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        # Po async_shutdown połączenie nie może zostać wznowione - przeładowana pozycja
+        # łączy się z tym samym identyfikatorem klienta i broker rozłączałby oba na zmianę
+        self._closed = False
+
+    def _qos(self, function: str) -> int:
+        """QoS dla tematów funkcji - odpytywanie CWP i polecenia osobno."""
+        return self._qos_poll if function == "CurrentWorkParameters" else self._qos_command
+
+    async def async_set_message_callback(self, message_callback: Callable[[Any], None]) -> None:
+        """Podmienia message_callback - pętla połączenia odczytuje go przy każdej wiadomości."""
+        self._message_callback = message_callback
+
+    @callback
+    def _async_ensure_started(self) -> None:
+        """Uruchamia pętlę połączenia (raz)."""
+        if self._closed:
+            raise ReqnetTransportError(f"Transport MQTT dla {self._mac} został zamknięty")
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), f"reqnet_direct_mqtt_{self._mac}"
+            )
+
+    async def _async_run(self) -> None:
+        """Utrzymuje połączenie z brokerem i przekazuje wiadomości do message_callback."""
+        try:
+            await self._async_connection_loop()
+        finally:
+            # Zakończona pętla nie może blokować ponownego uruchomienia w _async_ensure_started
+            self._task = None
+
+    async def _async_connection_loop(self) -> None:
+        """Łączy się z brokerem i ponawia połączenie z narastającym opóźnieniem."""
+        reconnect_delay = DIRECT_MQTT_RECONNECT_MIN
+        while True:
+            try:
+                async with aiomqtt.Client(
+                    hostname=self._broker,
+                    port=self._port,
+                    username=self._username,
+                    password=self._password,
+                    identifier=f"ha-reqnet-{self._mac.replace(':', '').lower()}",
+                    clean_session=False,
+                ) as client:
+                    # Ponowna subskrypcja po każdym połączeniu (broker mógł utracić sesję)
+                    for function in RESULT_FUNCTIONS:
+                        await client.subscribe(self.result_topic(function), qos=self._qos(function))
+                    self._client = client
+                    self._connected.set()
+                    reconnect_delay = DIRECT_MQTT_RECONNECT_MIN
+                    _LOGGER.info(f"Połączono z brokerem MQTT {self._broker}:{self._port} ({self._mac})")
+
+                    async for message in client.messages:
+                        try:
+                            self._message_callback(
+                                DirectMqttMessage(str(message.topic), message.payload)
+                            )
+                        except Exception as e:
+                            _LOGGER.exception(f"Błąd obsługi wiadomości MQTT z {message.topic}: {e}")
+            except aiomqtt.MqttError as e:
+                _LOGGER.warning(
+                    f"Utracono połączenie z brokerem MQTT {self._broker}:{self._port} ({self._mac}): {e}. "
+                    f"Ponowna próba za {reconnect_delay} s"
+                )
+            except Exception as e:
+                # Np. błędna nazwa hosta lub port - pętla działa dalej, zamiast kończyć zadanie
+                _LOGGER.exception(
+                    f"Błąd połączenia z brokerem MQTT {self._broker}:{self._port} ({self._mac}): {e}. "
+                    f"Ponowna próba za {reconnect_delay} s"
+                )
+            finally:
+                self._client = None
+                self._connected.clear()
+
+            await asyncio.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, DIRECT_MQTT_RECONNECT_MAX)
+
+    async def async_run_function(
+        self, function: str, params: dict[str, Any] | None = None
+    ) -> dict | None:
+        """Publikuje polecenie - odpowiedź trafi do message_callback."""
+        self._async_ensure_started()
+        if self._client is None:
+            try:
+                await asyncio.wait_for(self._connected.wait(), DIRECT_MQTT_CONNECT_TIMEOUT)
+            except asyncio.TimeoutError as e:
+                raise ReqnetTransportError(
+                    f"Brak połączenia z brokerem MQTT {self._broker}:{self._port}"
+                ) from e
+
+        topic = self.command_topic(function)
+        payload = json.dumps(params) if params else ""
+        client = self._client
+        if client is None:
+            raise ReqnetTransportError(f"Brak połączenia z brokerem MQTT {self._broker}:{self._port}")
+        try:
+            await client.publish(topic, payload, qos=self._qos(function), retain=False)
+        except aiomqtt.MqttError as e:
+            raise ReqnetTransportError(f"Nie udało się wysłać żądania MQTT na {topic}: {e}") from e
+        _LOGGER.debug(f"Wysłano żądanie na {topic} (direct, QoS {self._qos(function)})")
+        return None
+
+    async def async_shutdown(self) -> None:
+        """Zamyka połączenie z brokerem."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class ReqnetHttpTransport(ReqnetTransport):
+    """Transport przez lokalne API HTTP (/API/RunFunction) na współdzielonej sesji keep-alive."""
+
+    name = "http"
+
+    def __init__(self, hass: HomeAssistant, host: str) -> None:
+        """Inicjalizacja."""
+        self.hass = hass
+        self.host = host
+        self._url = f"http://{host}/API/RunFunction"
+
+    async def async_run_function(
+        self, function: str, params: dict[str, Any] | None = None
+    ) -> dict | None:
+        """Wywołuje funkcję API i zwraca zdekodowaną odpowiedź."""
+        session = async_get_http_session(self.hass)
+        query = {"name": function, **(params or {})}
+        try:
+            async with session.get(
+                self._url,
+                params=query,
+                timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise ReqnetTransportError(f"Błąd zapytania HTTP {function} do {self.host}: {e}") from e
+
+        if not isinstance(data, dict):
+            raise ReqnetTransportError(f"Nieoczekiwana odpowiedź HTTP {function} z {self.host}: {data}")
+        return data
+
+
+@callback
+def async_get_http_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Zwraca współdzieloną sesję HTTP (keep-alive, limit połączeń na host)."""
+    session: aiohttp.ClientSession | None = hass.data.get(HTTP_SESSION_KEY)
+    if session is not None and not session.closed:
+        return session
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONNECTION_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    session = aiohttp.ClientSession(connector=connector)
+    hass.data[HTTP_SESSION_KEY] = session
+
+    async def _async_close_session(event: Event) -> None:
+        hass.data.pop(HTTP_SESSION_UNSUB_KEY, None)
+        await session.close()
+
+    # Jeden nasłuch na sesję - usuwany razem z nią w async_close_http_session
+    hass.data[HTTP_SESSION_UNSUB_KEY] = hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_CLOSE, _async_close_session
+    )
+    return session
+
+
+async def async_close_http_session(hass: HomeAssistant) -> None:
+    """Zamyka współdzieloną sesję HTTP (po wyładowaniu ostatniego urządzenia)."""
+    session: aiohttp.ClientSession | None = hass.data.pop(HTTP_SESSION_KEY, None)
+    if (unsubscribe := hass.data.pop(HTTP_SESSION_UNSUB_KEY, None)) is not None:
+        unsubscribe()
+    if session is not None:
+        await session.close()
@@ -0,0 +1,206 @@
+"""WebSocket API - strumień zdekodowanych ramek CWP dla frontendu."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from time import monotonic
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, SIGNAL_COORDINATOR_SHUTDOWN
+from .coordinator import ReqnetDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_register_websocket_api(hass: HomeAssistant) -> None:
+    """Rejestruje komendy WebSocket integracji."""
+    websocket_api.async_register_command(hass, ws_subscribe_frames)
+
+
+class _FrameStream:
+    """Wysyła ramki jednego urządzenia do jednej subskrypcji WebSocket."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        coordinator: ReqnetDataCoordinator,
+        deltas: bool,
+        min_interval: float,
+        on_shutdown: Callable[["_FrameStream"], None],
+    ) -> None:
+        """Inicjalizacja."""
+        self._hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._coordinator = coordinator
+        self._deltas = deltas
+        self._min_interval = min_interval
+        self._on_shutdown = on_shutdown
+        self._last_values = None
+        self._last_sent_at = float("-inf")
+        self._unsub_listener = None
+        self._unsub_timer = None
+        self._unsub_shutdown = None
+
+    @callback
+    def async_start(self) -> None:
+        """Zaczyna nasłuch koordynatora i wysyła bieżącą ramkę."""
+        self._unsub_listener = self._coordinator.async_add_listener(self._async_frame_updated)
+        self._unsub_shutdown = async_dispatcher_connect(
+            self._hass,
+            SIGNAL_COORDINATOR_SHUTDOWN.format(self._coordinator.mac_address),
+            self._async_coordinator_shutdown,
+        )
+        self._async_frame_updated()
+
+    @callback
+    def async_stop(self) -> None:
+        """Kończy nasłuch."""
+        if self._unsub_listener is not None:
+            self._unsub_listener()
+            self._unsub_listener = None
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._unsub_shutdown is not None:
+            self._unsub_shutdown()
+            self._unsub_shutdown = None
+
+    @callback
+    def _async_coordinator_shutdown(self, coordinator: ReqnetDataCoordinator) -> None:
+        """Koordynator jest zamykany (wyładowanie lub przeładowanie pozycji)."""
+        if coordinator is not self._coordinator:
+            return
+        self._connection.send_message(
+            websocket_api.event_message(
+                self._msg_id, {"device": coordinator.mac_address, "unloaded": True}
+            )
+        )
+        self._on_shutdown(self)
+
+    @callback
+    def _async_frame_updated(self) -> None:
+        """Nowa ramka - wysyła od razu lub po upływie min_interval (zostaje najnowsza)."""
+        if self._unsub_timer is not None:
+            return
+
+        wait = self._min_interval - (monotonic() - self._last_sent_at)
+        if wait > 0:
+            self._unsub_timer = async_call_later(self._hass, wait, self._async_flush)
+            return
+
+        self._async_send()
+
+    @callback
+    def _async_flush(self, _now) -> None:
+        """Wysyła ramkę odłożoną przez downsampling."""
+        self._unsub_timer = None
+        self._async_send()
+
+    @callback
+    def _async_send(self) -> None:
+        """Wysyła pełną ramkę lub tylko zmienione indeksy."""
+        values = self._coordinator.data
+        if values is self._last_values:
+            # Koordynator powiadomił bez nowej ramki
+            return
+
+        payload: dict[str, Any] = {"device": self._coordinator.mac_address}
+        if values is not None:
+            # Numer ramki pozwala klientowi wykryć pominięte ramki (np. przy downsamplingu)
+            payload["seq"] = values.seq
+            payload["received_at"] = values.received_at
+
+        if values is None:
+            payload["values"] = None
+        elif (
+            self._deltas
+            and self._last_values is not None
+            and len(self._last_values) == len(values)
+        ):
+            changes = [
+                [index, value]
+                for index, (previous, value) in enumerate(zip(self._last_values, values))
+                if previous != value
+            ]
+            if not changes:
+                self._last_values = values
+                return
+            payload["delta"] = changes
+        else:
+            payload["values"] = values.as_list()
+
+        self._last_values = values
+        self._last_sent_at = monotonic()
+        self._connection.send_message(websocket_api.event_message(self._msg_id, payload))
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "reqnet/subscribe_frames",
+        vol.Optional("devices"): [cv.string],
+        vol.Optional("deltas", default=False): cv.boolean,
+        vol.Optional("min_interval", default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=3600)
+        ),
+    }
+)
+@callback
+def ws_subscribe_frames(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subskrypcja ramek CWP wskazanych urządzeń (MAC) lub wszystkich urządzeń."""
+    coordinators = {
+        coord.mac_address: coord
+        for coord in hass.data.get(DOMAIN, {}).values()
+        if isinstance(coord, ReqnetDataCoordinator)
+    }
+
+    if "devices" in msg:
+        requested = {device.replace(":", "").upper() for device in msg["devices"]}
+        missing = requested - coordinators.keys()
+        if missing:
+            connection.send_error(
+                msg["id"],
+                websocket_api.ERR_NOT_FOUND,
+                f"Nie znaleziono urządzeń Reqnet: {', '.join(sorted(missing))}",
+            )
+            return
+        coordinators = {mac: coordinators[mac] for mac in requested}
+
+    @callback
+    def _async_unsubscribe() -> None:
+        for stream in streams:
+            stream.async_stop()
+
+    @callback
+    def _async_device_unloaded(_stream: _FrameStream) -> None:
+        # Subskrypcja kończy się razem z urządzeniem - klient subskrybuje ponownie po przeładowaniu
+        if connection.subscriptions.pop(msg["id"], None) is not None:
+            _async_unsubscribe()
+
+    streams = [
+        _FrameStream(
+            hass, connection, msg["id"], coord, msg["deltas"], msg["min_interval"], _async_device_unloaded
+        )
+        for coord in coordinators.values()
+    ]
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+
+    for stream in streams:
+        stream.async_start()
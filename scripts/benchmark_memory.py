@@ -0,0 +1,89 @@
+"""Pomiar pamięci integracji Reqnet dla floty urządzeń (tracemalloc).
+
+Buduje opisy encji (współdzielone) oraz N koordynatorów z kompletem encji
+i wypisuje liczbę bajtów na urządzenie. Wymaga zainstalowanego homeassistant
+oraz zależności z manifest.json. Uruchomienie z katalogu głównego repozytorium:
+
+    python scripts/benchmark_memory.py --devices 100
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Liczba wartości w ramce CWP (najwyższy używany indeks to 99)
+FRAME_VALUES = 100
+
+
+def _traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def _async_main(devices: int) -> None:
+    from homeassistant.core import HomeAssistant
+
+    tracemalloc.start()
+
+    # Opisy encji tworzone są przy imporcie modułów platform - raz dla wszystkich urządzeń
+    before_import = _traced()
+    from custom_components.reqnet.binary_sensor import BINARY_SENSOR_DESCRIPTIONS, ReqnetBinarySensor
+    from custom_components.reqnet.button import (
+        BUTTON_DESCRIPTIONS,
+        ReqnetAutomaticModeButton,
+        ReqnetManualModeButton,
+    )
+    from custom_components.reqnet.coordinator import ReqnetDataCoordinator
+    from custom_components.reqnet.frame import ReqnetFrame
+    from custom_components.reqnet.sensor import SENSOR_DESCRIPTIONS, ReqnetSensor
+    shared = _traced() - before_import
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+
+        coordinators = []
+        entities = []
+        start = _traced()
+        for number in range(devices):
+            mac_address = f"AA:BB:CC:{number >> 16 & 0xFF:02X}:{number >> 8 & 0xFF:02X}:{number & 0xFF:02X}"
+            coordinator = ReqnetDataCoordinator(hass, mac_address)
+            coordinator.data = ReqnetFrame([float(i) for i in range(FRAME_VALUES)], 1, 0.0, "benchmark")
+            coordinators.append(coordinator)
+        after_coordinators = _traced()
+
+        for coordinator in coordinators:
+            entities.extend(ReqnetSensor(coordinator, description) for description in SENSOR_DESCRIPTIONS)
+            entities.extend(ReqnetBinarySensor(coordinator, description) for description in BINARY_SENSOR_DESCRIPTIONS)
+            automatic, manual = BUTTON_DESCRIPTIONS
+            entities.append(ReqnetAutomaticModeButton(coordinator, automatic))
+            entities.append(ReqnetManualModeButton(coordinator, manual))
+        end = _traced()
+
+        tracemalloc.stop()
+        await hass.async_stop(force=True)
+
+    per_device_entities = len(entities) // devices
+    print(f"Urządzenia: {devices}, encji na urządzenie: {per_device_entities}")
+    print(f"Opisy encji i moduły (wspólne): {shared / 1024:.1f} KiB")
+    print(f"Koordynator z ramką:            {(after_coordinators - start) / devices:.0f} B/urządzenie")
+    print(f"Encje:                          {(end - after_coordinators) / devices:.0f} B/urządzenie "
+          f"({(end - after_coordinators) / len(entities):.0f} B/encję)")
+    print(f"Razem:                          {(end - start) / devices:.0f} B/urządzenie")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100, help="liczba symulowanych urządzeń (domyślnie 100)")
+    args = parser.parse_args()
+    asyncio.run(_async_main(args.devices))
+
+
+if __name__ == "__main__":
+    main()
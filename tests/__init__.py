@@ -0,0 +1 @@
+"""Testy integracji Reqnet."""
@@ -0,0 +1,115 @@
+"""Transport direct_mqtt na lokalnym brokerze uruchomionym w procesie testu (amqtt)."""
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+aiomqtt = pytest.importorskip("aiomqtt")
+amqtt_broker = pytest.importorskip("amqtt.broker")
+
+from custom_components.reqnet.transport import (  # noqa: E402
+    ReqnetDirectMqttTransport,
+    ReqnetTransportError,
+)
+
+MAC = "AA:BB:CC:DD:EE:FF"
+VALUES = [1, 300, 21.5, 280, 270]
+
+
+def _free_port() -> int:
+    """Wolny port TCP na localhost dla brokera."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start_broker(port: int):
+    """Broker MQTT w procesie testu (anonimowy dostęp, tylko localhost)."""
+    broker = amqtt_broker.Broker(
+        {
+            "listeners": {"default": {"type": "tcp", "bind": f"127.0.0.1:{port}"}},
+            "sys_interval": 0,
+            "auth": {"allow-anonymous": True, "plugins": ["auth_anonymous"]},
+            "topic-check": {"enabled": False},
+        }
+    )
+    await broker.start()
+    return broker
+
+
+async def test_direct_mqtt_round_trip(hass, socket_enabled) -> None:
+    """Żądanie CWP trafia do urządzenia, a odpowiedź wraca do message_callback."""
+    port = _free_port()
+    broker = await _start_broker(port)
+    received: asyncio.Queue = asyncio.Queue()
+    transport = ReqnetDirectMqttTransport(
+        hass, MAC, received.put_nowait, broker="127.0.0.1", port=port, qos_poll=1
+    )
+    try:
+        async with aiomqtt.Client("127.0.0.1", port=port, identifier="reqnet-device") as device:
+            await device.subscribe(f"{MAC}/CurrentWorkParameters", qos=1)
+
+            assert await transport.async_run_function("CurrentWorkParameters") is None
+
+            # Symulowane urządzenie odpowiada na żądanie
+            async with asyncio.timeout(10):
+                async for message in device.messages:
+                    assert str(message.topic) == f"{MAC}/CurrentWorkParameters"
+                    await device.publish(
+                        f"{MAC}/CurrentWorkParametersResult",
+                        json.dumps({"CurrentWorkParametersResult": True, "Values": VALUES}),
+                        qos=1,
+                    )
+                    break
+
+            async with asyncio.timeout(10):
+                msg = await received.get()
+
+        assert msg.topic == f"{MAC}/CurrentWorkParametersResult"
+        assert json.loads(msg.payload)["Values"] == VALUES
+    finally:
+        await transport.async_shutdown()
+        await broker.shutdown()
+
+
+async def test_direct_mqtt_loop_survives_unexpected_errors(hass, socket_enabled, monkeypatch) -> None:
+    """Błąd spoza aiomqtt nie kończy pętli połączenia - transport łączy się przy kolejnej próbie."""
+    port = _free_port()
+    broker = await _start_broker(port)
+    monkeypatch.setattr("custom_components.reqnet.transport.DIRECT_MQTT_RECONNECT_MIN", 0.1)
+
+    transport = ReqnetDirectMqttTransport(
+        hass, MAC, lambda msg: None, broker="127.0.0.1", port=port
+    )
+    real_client = aiomqtt.Client
+    attempts = 0
+
+    def _client(*args, **kwargs):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ValueError("pierwsza próba nieudana")
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr("custom_components.reqnet.transport.aiomqtt.Client", _client)
+    try:
+        assert await transport.async_run_function("AutomaticMode") is None
+        assert attempts == 2
+    finally:
+        await transport.async_shutdown()
+        await broker.shutdown()
+
+
+async def test_direct_mqtt_not_restarted_after_shutdown(hass) -> None:
+    """Po zamknięciu transport nie wznawia połączenia (np. z zaległego odświeżenia)."""
+    transport = ReqnetDirectMqttTransport(hass, MAC, lambda msg: None, broker="127.0.0.1")
+    await transport.async_shutdown()
+
+    with pytest.raises(ReqnetTransportError):
+        await transport.async_run_function("CurrentWorkParameters")
+    assert transport._task is None
+